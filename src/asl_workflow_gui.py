@@ -1,7 +1,7 @@
 import sys
 from PySide6.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QMessageBox,
-    QLabel, QDialog, QHBoxLayout, QTextEdit
+    QLabel, QDialog, QHBoxLayout, QTextEdit, QCheckBox
     )
 from PySide6.QtCore import QThread, Signal, Qt, Slot # Pentru threading
 from qt_material import apply_stylesheet # Pentru stilizare
@@ -10,10 +10,34 @@ import subprocess
 import os
 
 from auth_dialog import LoginDialog # Importa dialogul de autentificare
-from capture_window import CaptureWindow # Importa fereastra de capturare a imaginilor
-from dataset_worker import DatasetCreationWorker # Importa worker-ul pentru crearea setului de date
-from model_training_worker import ModelTrainingWorker # Importa worker-ul pentru antrenarea modelului
-from test_window_worker import InferenceWindow
+
+# Modulele pasilor (OpenCV, MediaPipe, pandas, scikit-learn) sunt importate abia la prima
+# folosire a pasului respectiv, ca dialogul de autentificare sa apara imediat.
+
+
+class ModelPreloadWorker(QThread):
+    """Incarca modelul in cache-ul procesului dupa autentificare, ca fereastra de test sa porneasca repede."""
+
+    finished = Signal(bool, str)
+
+    def __init__(self, backend="compiled"):
+        super().__init__()
+        self.backend = backend
+
+    def run(self):
+        try:
+            from inference_engine import MODEL_PATH
+            from model_artifact import MODEL_ARTIFACT_PATH, artifact_exists
+            from model_cache import model_cache
+            # Backend-ul "compiled" se poate incarca si doar din artefact, fara model.joblib
+            has_artifact = self.backend == "compiled" and artifact_exists(MODEL_ARTIFACT_PATH)
+            if not has_artifact and not os.path.exists(MODEL_PATH):
+                self.finished.emit(False, "Nu exista inca un model antrenat; se va incarca la prima testare.")
+                return
+            model_cache.get(self.backend)
+            self.finished.emit(True, "Modelul a fost incarcat in fundal.")
+        except Exception as e:
+            self.finished.emit(False, f"Modelul nu a putut fi incarcat in fundal: {e}")
 
 
 # Clasa principala a aplicatiei GUI
@@ -26,6 +50,15 @@ class ASLWorkflowApp(QWidget):
 
         self.setVisible(False)
         self.init_ui()
+
+        # Modelul se incarca in fundal cat timp utilizatorul alege pasul urmator
+        self.model_preload_worker = ModelPreloadWorker()
+        self.model_preload_worker.finished.connect(self.on_model_preloaded)
+        self.model_preload_worker.start()
+
+    @Slot(bool, str)
+    def on_model_preloaded(self, success, message):
+        self.process_log_text.append(message)
     
     def init_ui(self):
         # Layout vertical pentru butoane
@@ -62,6 +95,16 @@ class ASLWorkflowApp(QWidget):
         self.btn_train.setFixedSize(250, 50)
         buttons_layout.addWidget(self.btn_train, alignment=Qt.AlignmentFlag.AlignCenter)
 
+        # Cautare de hiperparametri cu validare incrucisata in loc de parametrii fixi
+        self.search_checkbox = QCheckBox("Cautare hiperparametri (CV)")
+        self.search_checkbox.setToolTip("Evalueaza mai multe configuratii in paralel si alege cel mai rapid model suficient de precis")
+        buttons_layout.addWidget(self.search_checkbox, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        # Compactarea modelului dupa antrenare (arbori si adancime), pentru inferenta mai rapida
+        self.compact_checkbox = QCheckBox("Compactare model")
+        self.compact_checkbox.setToolTip("Pastreaza doar arborii si adancimea necesare, cu cel mult 0.5 puncte pierdere de acuratete")
+        buttons_layout.addWidget(self.compact_checkbox, alignment=Qt.AlignmentFlag.AlignCenter)
+
         # Buton pentru testarea modelului
         self.btn_test = QPushButton("4. Testeaza Modelul")
         self.btn_test.clicked.connect(self.start_testing)
@@ -97,6 +140,8 @@ class ASLWorkflowApp(QWidget):
         self.process_log_text.append("Fereastra de colectare imagini este deschisa...")
         self.set_buttons_enabled(False)
 
+        from capture_window import CaptureWindow # Importa fereastra de capturare a imaginilor
+
         self.capture_window = CaptureWindow(self) # Creeaza o fereastra de capturare a imaginilor
         self.capture_window.collection_finished.connect(self.on_collection_finished)
         self.capture_window.exec()
@@ -112,6 +157,7 @@ class ASLWorkflowApp(QWidget):
         self.process_log_text.append("Creare set de date in curs...")
         self.set_buttons_enabled(False)
 
+        from dataset_worker import DatasetCreationWorker # Importa worker-ul pentru crearea setului de date
         self.dataset_worker = DatasetCreationWorker()
         # self.dataset_worker.log_message.connect(self.status_label.setText) # Afiseaza mesajele log in status_label
         self.dataset_worker.progress_update.connect(
@@ -135,7 +181,11 @@ class ASLWorkflowApp(QWidget):
         self.process_log_text.clear()
         self.process_log_text.append("Incepe antrenarea modelului...")
 
+        from model_training_worker import ModelTrainingWorker # Importa worker-ul pentru antrenarea modelului
         self.training_worker = ModelTrainingWorker()
+        self.training_worker.search_mode = self.search_checkbox.isChecked()
+        self.training_worker.compact_model = self.compact_checkbox.isChecked()
+        self.training_worker.log_message.connect(self.process_log_text.append)
         self.training_worker.finished.connect(self.on_model_training_finished)
         self.training_worker.start()
     
@@ -156,6 +206,15 @@ class ASLWorkflowApp(QWidget):
             accuracy = evaluation_results.get('accuracy', 'N/A')
             self.process_log_text.append(f"<p><b>Acuratețe:</b> <span style='color: yellow;'>{accuracy}</span></p>")
 
+            # Rezultatul cautarii de hiperparametri, daca a fost folosita
+            if 'search' in evaluation_results:
+                self.process_log_text.append(f"<p><b>Parametri alesi:</b> {evaluation_results['search']}</p>")
+
+            # Raportul compactarii, daca a fost folosita
+            if 'compaction_report' in evaluation_results:
+                self.process_log_text.append("<p><b>Compactare model:</b></p>")
+                self.process_log_text.append(f"<pre style='background-color: #333; padding: 10px; border-radius: 5px;'>{evaluation_results['compaction_report']}</pre>")
+
             # Raportul de clasificare
             classification_report = evaluation_results.get('classification_report', 'N/A')
             self.process_log_text.append("<p><b>Raport de Clasificare:</b></p>")
@@ -174,6 +233,7 @@ class ASLWorkflowApp(QWidget):
         self.process_log_text.append("<p style='color: orange;'>Pornire testare model")
         self.set_buttons_enabled(False)
 
+        from test_window_worker import InferenceWindow
         self.inference_window = InferenceWindow(self)
         self.inference_window.inference_finished.connect(self.on_testing_finished)
         self.inference_window.exec()
@@ -204,6 +264,8 @@ class ASLWorkflowApp(QWidget):
         self.btn_collect.setEnabled(enable)
         self.btn_create_dataset.setEnabled(enable)
         self.btn_train.setEnabled(enable)
+        self.search_checkbox.setEnabled(enable)
+        self.compact_checkbox.setEnabled(enable)
         self.btn_test.setEnabled(enable)
 
 
@@ -0,0 +1,221 @@
+"""Inferenta fara interfata grafica si fara camera, pentru evaluarea modelului offline (ex. pe CI).
+
+Exemple:
+    python src/batch_inference.py --images ./data --output rezultate.csv
+    python src/batch_inference.py --video test.mp4 --frame-step 2 --output rezultate.jsonl
+    python src/batch_inference.py --dataset dataset --output rezultate.csv
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import numpy as np
+import cv2
+
+from landmark_extraction import EXTRACT_OK, iter_extract_serial, iter_extract_parallel
+from inference_engine import InferenceEngine, load_inference_model, letter_for_label, INFERENCE_BACKENDS, MODEL_PATH
+from dataset_io import dataset_exists, dataset_paths, load_dataset, load_dataset_csv, labels_from_indices
+
+RESULT_FIELDS = ["item", "status", "label", "letter", "confidence", "true_label"]
+
+
+def list_images(directory):
+    """(id, cale, eticheta reala) pentru fiecare .jpg; eticheta este directorul parinte daca e numeric."""
+    items = []
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            if not filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+                continue
+            path = os.path.join(root, filename)
+            parent = os.path.basename(root)
+            true_label = int(parent) if parent.isdigit() else None
+            items.append((os.path.relpath(path, directory), path, true_label))
+    items.sort(key=lambda item: item[0])
+    return items
+
+
+def iter_video_frames(path, frame_step=1):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Nu s-a putut deschide fisierul video '{path}'.")
+    try:
+        index = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if index % frame_step == 0:
+                yield f"frame_{index}", frame, None
+            index += 1
+    finally:
+        cap.release()
+
+
+def iter_extracted(items, num_workers, chunk_size):
+    """Ruleaza detectia (in paralel daca num_workers > 1) si intoarce (id, eticheta reala, status, caracteristici)."""
+    metadata = []
+
+    def sources():
+        for item_id, source, true_label in items:
+            metadata.append((item_id, true_label))
+            yield source
+
+    if num_workers > 1:
+        results = iter_extract_parallel(sources(), num_workers, chunk_size)
+    else:
+        results = iter_extract_serial(sources())
+    try:
+        for i, (status, features) in enumerate(results):
+            item_id, true_label = metadata[i]
+            metadata[i] = None # Nu pastram toate id-urile in memorie pentru video-uri lungi
+            yield item_id, true_label, status, features
+    finally:
+        results.close()
+
+
+def load_dataset_source(path):
+    """Incarca setul de date binar cu prefixul `path` sau, daca path se termina in .csv, fisierul CSV.
+
+    Se apeleaza inainte de deschiderea fisierului de rezultate, ca o cale gresita sa nu il goleasca.
+    """
+    if path.endswith('.csv'):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Fisierul CSV '{path}' nu exista.")
+        features, labels, class_names = load_dataset_csv(path)
+    elif dataset_exists(path):
+        features, labels, class_names = load_dataset(path, mmap=True)
+    else:
+        raise FileNotFoundError(f"Setul de date binar '{path}' nu exista (lipseste {dataset_paths(path)[2]}).")
+    return features, labels_from_indices(labels, class_names)
+
+
+def iter_dataset(features, true_labels):
+    for i in range(features.shape[0]):
+        yield f"row_{i}", true_labels[i], EXTRACT_OK, features[i]
+
+
+class ResultWriter:
+    """Scrie rezultatele ca CSV sau JSONL, dupa extensia fisierului."""
+
+    def __init__(self, path):
+        self.jsonl = path.endswith('.jsonl')
+        self.fh = open(path, 'w', newline='', encoding='utf-8')
+        if not self.jsonl:
+            self.csv_writer = csv.DictWriter(self.fh, fieldnames=RESULT_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.fh.write(json.dumps(row) + "\n")
+        else:
+            self.csv_writer.writerow(row)
+
+    def close(self):
+        self.fh.close()
+
+
+def _plain(value):
+    # Valorile numpy nu pot fi scrise direct in JSON
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def score_items(engine, extracted, writer, batch_size=256):
+    """Prezice pe loturi: un singur predict_proba pentru toate mainile detectate dintr-un lot."""
+    stats = {"items": 0, "with_hand": 0, "labeled": 0, "correct": 0}
+    batch = []
+
+    def flush():
+        rows_with_hand = [row for row in batch if row[2] == EXTRACT_OK]
+        predictions = []
+        if rows_with_hand:
+            features = np.stack([row[3] for row in rows_with_hand])
+            predictions = engine.predict_batch(features)
+        predictions = iter(predictions)
+
+        for item_id, true_label, status, _ in batch:
+            row = {"item": item_id, "status": status, "label": None, "letter": None,
+                   "confidence": None, "true_label": _plain(true_label)}
+            if status == EXTRACT_OK:
+                prediction = next(predictions)
+                label = _plain(prediction.label)
+                row["label"] = label
+                row["letter"] = letter_for_label(label)
+                row["confidence"] = round(prediction.confidence, 6)
+                stats["with_hand"] += 1
+                if true_label is not None:
+                    stats["labeled"] += 1
+                    stats["correct"] += int(label == _plain(true_label))
+            writer.write(row)
+            stats["items"] += 1
+        batch.clear()
+
+    for item in extracted:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Inferenta pe loturi pentru imagini, video sau un set de date deja extras.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--images", help="director cu imagini (se parcurge recursiv)")
+    source.add_argument("--video", help="fisier video")
+    source.add_argument("--dataset", help="prefixul setului de date binar sau un fisier .csv")
+    parser.add_argument("--output", required=True, help="fisierul de rezultate (.csv sau .jsonl)")
+    parser.add_argument("--model", default=MODEL_PATH, help="modelul joblib (implicit ./model.joblib)")
+    parser.add_argument("--artifact", help="artefactul modelului (director sau .npz); implicit <model>_artifact")
+    parser.add_argument("--backend", choices=INFERENCE_BACKENDS, default="compiled")
+    parser.add_argument("--workers", type=int, default=max(1, os.cpu_count() or 1), help="procese pentru detectia MediaPipe")
+    parser.add_argument("--chunk-size", type=int, default=32, help="imagini trimise unui proces intr-o sarcina")
+    parser.add_argument("--batch-size", type=int, default=256, help="randuri per apel predict_proba")
+    parser.add_argument("--frame-step", type=int, default=1, help="pentru video: se proceseaza fiecare al N-lea frame")
+    parser.add_argument("--summary-json", help="scrie si un rezumat JSON (numar, rata, acuratete)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    artifact_path = args.artifact or os.path.splitext(args.model)[0] + "_artifact"
+    engine = InferenceEngine(load_inference_model(args.backend, model_path=args.model, compiled_path=artifact_path))
+
+    if args.dataset:
+        try:
+            extracted = iter_dataset(*load_dataset_source(args.dataset))
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Eroare: {e}", file=sys.stderr)
+            return 1
+    elif args.images:
+        extracted = iter_extracted(list_images(args.images), args.workers, args.chunk_size)
+    else:
+        extracted = iter_extracted(iter_video_frames(args.video, max(1, args.frame_step)), args.workers, args.chunk_size)
+
+    writer = ResultWriter(args.output)
+    start = time.perf_counter()
+    try:
+        stats = score_items(engine, extracted, writer, args.batch_size)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    stats["seconds"] = round(elapsed, 3)
+    stats["items_per_second"] = round(stats["items"] / elapsed, 2) if elapsed > 0 else None
+    stats["accuracy"] = round(stats["correct"] / stats["labeled"], 4) if stats["labeled"] else None
+
+    print(f"Procesate {stats['items']} elemente ({stats['with_hand']} cu mana detectata) in {elapsed:.2f} s "
+          f"- {stats['items_per_second']} elemente/s")
+    if stats["accuracy"] is not None:
+        print(f"Acuratete pe elementele etichetate: {stats['accuracy'] * 100:.2f}%")
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as fh:
+            json.dump(stats, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+"""Benchmark-uri reproductibile pentru etapele aplicatiei, fara camera si fara interfata grafica.
+
+Datele sunt sintetice, generate cu seed fix: landmark-uri grupate pe clase si frame-uri JPEG
+de marimea camerei. Frame-urile sintetice nu contin maini, deci extragerea lor masoara doar calea
+"no_hand" (marcata cu "input": "synthetic_no_hand"); pentru detectia completa se folosesc imagini
+reale cu --images.
+Rezultatele sunt scrise ca JSON; cu --baseline se compara cu o rulare anterioara.
+
+Exemple:
+    python src/benchmark_suite.py --output bench.json
+    python src/benchmark_suite.py --quick --only predict,model_load
+    python src/benchmark_suite.py --baseline bench_baseline.json --tolerance 0.2
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+from types import SimpleNamespace
+import numpy as np
+import cv2
+
+from hand_features import NUM_LANDMARKS, wrist_relative_features, landmarks_to_features
+
+BENCHMARK_VERSION = 1
+DEFAULT_TOLERANCE = 0.2 # O etapa cu mediana de peste 1.2x fata de baseline este o regresie
+MIN_DELTA_MS = 0.5 # Sub aceasta diferenta absoluta variatia este zgomot (etape sub o milisecunda)
+FRAME_SHAPE = (480, 640, 3) # Marimea frame-urilor camerei
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+class BenchmarkSkipped(Exception):
+    """Etapa nu poate rula in mediul curent (ex. lipseste detectorul MediaPipe)."""
+
+
+def measure(fn, repeats, items=1, warmup=1):
+    """Ruleaza fn de warmup + repeats ori; timpii sunt in ms per apel, items = elemente per apel."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    times = np.asarray(times)
+    median = float(np.median(times))
+    return {
+        "median_ms": round(median, 4),
+        "min_ms": round(float(times.min()), 4),
+        "p95_ms": round(float(np.percentile(times, 95)), 4),
+        "max_ms": round(float(times.max()), 4),
+        "repeats": int(repeats),
+        "items": int(items),
+        "items_per_s": round(items * 1000.0 / median, 2) if median > 0 else None,
+    }
+
+
+def synthetic_landmarks(num_classes, samples_per_class, random_state=42):
+    """(puncte (N, 21, 3), etichete): fiecare clasa este o mana 'medie' plus zgomot."""
+    rng = np.random.default_rng(random_state)
+    centers = rng.uniform(0.2, 0.8, size=(num_classes, NUM_LANDMARKS, 3)).astype(np.float32)
+    centers[..., 2] -= 0.5
+    labels = np.repeat(np.arange(num_classes, dtype=np.int32), samples_per_class)
+    noise = rng.normal(0.0, 0.03, size=(len(labels), NUM_LANDMARKS, 3)).astype(np.float32)
+    return centers[labels] + noise, labels
+
+
+def synthetic_frame(rng):
+    """Frame BGR cu gradient si cateva forme, ca JPEG-ul sa aiba o marime realista."""
+    height, width, _ = FRAME_SHAPE
+    frame = np.empty(FRAME_SHAPE, dtype=np.uint8)
+    frame[..., 0] = np.linspace(0, 255, width, dtype=np.uint8)
+    frame[..., 1] = np.linspace(0, 255, height, dtype=np.uint8)[:, np.newaxis]
+    frame[..., 2] = rng.integers(0, 256)
+    for _ in range(8):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.circle(frame, center, int(rng.integers(10, 80)), color, -1)
+    return frame
+
+
+def _fake_hand(points):
+    # Aceeasi forma ca hand_landmarks din MediaPipe (obiecte cu x, y, z)
+    return SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points])
+
+
+def _list_images(images_dir, limit):
+    paths = []
+    for root, _, files in os.walk(images_dir):
+        paths.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(paths)[:limit]
+
+
+class BenchmarkSuite:
+    """Pregateste datele sintetice o singura data si ruleaza etapele selectate."""
+
+    def __init__(self, work_dir, num_classes=24, samples_per_class=100, num_images=64, repeats=5,
+                 num_workers=None, images_dir=None, random_state=42):
+        self.work_dir = work_dir
+        self.num_classes = num_classes
+        self.samples_per_class = samples_per_class
+        self.num_images = num_images
+        self.repeats = repeats
+        self.num_workers = num_workers or max(1, (os.cpu_count() or 1) - 1)
+        self.images_dir = images_dir
+        self.random_state = random_state
+
+        points, self.labels = synthetic_landmarks(num_classes, samples_per_class, random_state)
+        self.points = points
+        self.features = wrist_relative_features(points)
+        self.class_names = [str(i) for i in range(num_classes)]
+        self._model = None
+        self._image_paths = None
+
+        # Ordinea etapelor urmeaza fluxul aplicatiei: captura, set de date, antrenare, inferenta
+        self.benchmarks = [
+            ("capture_save_with_flip", self.bench_capture_save),
+            ("capture_async_writer", self.bench_capture_async_writer),
+            ("extraction_serial", self.bench_extraction_serial),
+            ("extraction_parallel", self.bench_extraction_parallel),
+            ("feature_conversion_single", self.bench_feature_conversion_single),
+            ("feature_conversion_batch", self.bench_feature_conversion_batch),
+            ("dataset_write_binary", self.bench_dataset_write_binary),
+            ("dataset_read_binary", self.bench_dataset_read_binary),
+            ("dataset_write_csv", self.bench_dataset_write_csv),
+            ("dataset_read_csv", self.bench_dataset_read_csv),
+            ("training_fit", self.bench_training_fit),
+            ("model_load_joblib", self.bench_model_load_joblib),
+            ("model_load_artifact", self.bench_model_load_artifact),
+            ("predict_single_sklearn", lambda: self.bench_predict_single("sklearn")),
+            ("predict_single_compiled", lambda: self.bench_predict_single("compiled")),
+            ("predict_batch_sklearn", lambda: self.bench_predict_batch("sklearn")),
+            ("predict_batch_compiled", lambda: self.bench_predict_batch("compiled")),
+        ]
+
+    def config(self):
+        return {"num_classes": self.num_classes, "samples_per_class": self.samples_per_class,
+                "num_images": self.num_images, "repeats": self.repeats, "num_workers": self.num_workers,
+                "images_dir": self.images_dir, "random_state": self.random_state}
+
+    def _path(self, *names):
+        path = os.path.join(self.work_dir, *names)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    # --- Captura ---
+
+    def _frames(self, count):
+        rng = np.random.default_rng(self.random_state)
+        return [synthetic_frame(rng) for _ in range(count)]
+
+    def bench_capture_save(self):
+        from capture_window import save_image_with_flip
+        frames = self._frames(self.num_images)
+        class_dir = os.path.dirname(self._path("capture", "0", "x"))
+
+        def save_all():
+            for i, frame in enumerate(frames):
+                save_image_with_flip(frame, class_dir, f"md_lb_{i}")
+        return measure(save_all, self.repeats, items=len(frames))
+
+    def bench_capture_async_writer(self):
+        from image_writer import AsyncImageWriter
+        frames = self._frames(self.num_images)
+        class_dir = os.path.dirname(self._path("capture_async", "0", "x"))
+        writer = AsyncImageWriter(save_flipped=True)
+
+        def save_all():
+            for i, frame in enumerate(frames):
+                while not writer.submit(frame, class_dir, f"md_lb_{i}"):
+                    time.sleep(0.001) # Coada plina: asteptam ca in bucla de captura
+            writer.flush()
+        try:
+            return measure(save_all, self.repeats, items=len(frames))
+        finally:
+            writer.close()
+
+    # --- Extragerea landmark-urilor (logica din DatasetCreationWorker) ---
+
+    def image_paths(self):
+        if self._image_paths is None:
+            if self.images_dir:
+                self._image_paths = _list_images(self.images_dir, self.num_images)
+            else:
+                self._image_paths = []
+                for i, frame in enumerate(self._frames(self.num_images)):
+                    path = self._path("extraction", f"img_{i}.jpg")
+                    cv2.imwrite(path, frame)
+                    self._image_paths.append(path)
+            if not self._image_paths:
+                raise BenchmarkSkipped(f"Nu exista imagini in '{self.images_dir}'.")
+        return self._image_paths
+
+    def _hands_detector(self):
+        from landmark_extraction import create_hands_detector
+        try:
+            return create_hands_detector()
+        except Exception as e:
+            raise BenchmarkSkipped(f"Detectorul MediaPipe nu poate fi creat: {e}")
+
+    def _extraction_input(self):
+        # Frame-urile sintetice nu contin o mana: se masoara doar calea "no_hand" a detectiei
+        return "images_dir" if self.images_dir else "synthetic_no_hand"
+
+    def bench_extraction_serial(self):
+        from landmark_extraction import iter_extract_serial
+        hands = self._hands_detector()
+        paths = self.image_paths()
+        result = measure(lambda: list(iter_extract_serial(paths, hands)), self.repeats, items=len(paths))
+        result["input"] = self._extraction_input()
+        return result
+
+    def bench_extraction_parallel(self):
+        from landmark_extraction import iter_extract_parallel
+        if self.num_workers < 2:
+            raise BenchmarkSkipped("Un singur proces disponibil.")
+        self._hands_detector() # Aceeasi verificare ca in modul serial, inainte de pornirea pool-ului
+        paths = self.image_paths()
+        # Include pornirea pool-ului, ca o rulare reala de creare a setului de date
+        chunk_size = max(1, len(paths) // (self.num_workers * 4))
+        result = measure(lambda: list(iter_extract_parallel(paths, self.num_workers, chunk_size)),
+                         self.repeats, items=len(paths), warmup=0)
+        result["input"] = self._extraction_input()
+        return result
+
+    # --- Caracteristici ---
+
+    def bench_feature_conversion_single(self):
+        hands = [_fake_hand(points) for points in self.points[:1000]]
+        return measure(lambda: [landmarks_to_features(hand) for hand in hands], self.repeats, items=len(hands))
+
+    def bench_feature_conversion_batch(self):
+        return measure(lambda: wrist_relative_features(self.points), self.repeats, items=len(self.points))
+
+    # --- Setul de date ---
+
+    def bench_dataset_write_binary(self):
+        from dataset_io import save_dataset
+        prefix = self._path("dataset", "dataset")
+        return measure(lambda: save_dataset(self.features, self.labels, self.class_names, prefix),
+                       self.repeats, items=len(self.features))
+
+    def bench_dataset_read_binary(self):
+        from dataset_io import save_dataset, load_dataset
+        prefix = self._path("dataset", "dataset")
+        save_dataset(self.features, self.labels, self.class_names, prefix)
+        return measure(lambda: load_dataset(prefix, mmap=False), self.repeats, items=len(self.features))
+
+    def bench_dataset_write_csv(self):
+        from dataset_io import export_dataset_csv
+        path = self._path("dataset", "dataset.csv")
+        return measure(lambda: export_dataset_csv(path, self.features, self.labels, self.class_names),
+                       self.repeats, items=len(self.features))
+
+    def bench_dataset_read_csv(self):
+        from dataset_io import export_dataset_csv, load_dataset_csv
+        path = self._path("dataset", "dataset.csv")
+        export_dataset_csv(path, self.features, self.labels, self.class_names)
+        return measure(lambda: load_dataset_csv(path), self.repeats, items=len(self.features))
+
+    # --- Antrenare si incarcarea modelului ---
+
+    def _fit(self):
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split
+        from dataset_io import labels_from_indices
+        from model_training_worker import DEFAULT_FOREST_PARAMS
+        # Aceeasi impartire si aceiasi parametri ca ModelTrainingWorker
+        y = labels_from_indices(self.labels, self.class_names)
+        X_train, _, y_train, _ = train_test_split(self.features, y, test_size=0.2, random_state=42,
+                                                  shuffle=True, stratify=y)
+        model = RandomForestClassifier(**DEFAULT_FOREST_PARAMS, random_state=42, n_jobs=-1)
+        return model.fit(X_train, y_train)
+
+    def model(self):
+        if self._model is None:
+            self._model = self._fit()
+        return self._model
+
+    def bench_training_fit(self):
+        # Antrenarea este lenta; modelul ultimei repetari este refolosit de etapele urmatoare
+        def fit():
+            self._model = self._fit()
+        return measure(fit, max(1, min(self.repeats, 3)), items=int(len(self.features) * 0.8), warmup=0)
+
+    def _model_paths(self):
+        import joblib
+        from compiled_forest import compile_forest
+        from model_artifact import save_model_artifact
+        model_path = self._path("model", "model.joblib")
+        artifact_path = self._path("model", "model_artifact")
+        if not os.path.exists(model_path):
+            joblib.dump(self.model(), model_path)
+            save_model_artifact(compile_forest(self.model()), artifact_path)
+        return model_path, artifact_path
+
+    def bench_model_load_joblib(self):
+        import joblib
+        model_path, _ = self._model_paths()
+        return measure(lambda: joblib.load(model_path), self.repeats)
+
+    def bench_model_load_artifact(self):
+        from model_artifact import load_model_artifact
+        _, artifact_path = self._model_paths()
+        return measure(lambda: load_model_artifact(artifact_path, mmap=True), self.repeats)
+
+    # --- Inferenta ---
+
+    def _engine(self, backend):
+        from inference_engine import InferenceEngine
+        from compiled_forest import compile_forest
+        model = compile_forest(self.model()) if backend == "compiled" else self.model()
+        return InferenceEngine(model)
+
+    def bench_predict_single(self, backend):
+        """Un rand per apel, ca in inferenta live; timpul raportat este pentru 200 de randuri."""
+        engine = self._engine(backend)
+        rows = self.features[:200]
+        return measure(lambda: [engine.predict(row) for row in rows], self.repeats, items=len(rows))
+
+    def bench_predict_batch(self, backend):
+        engine = self._engine(backend)
+        batch = self.features[:256]
+        return measure(lambda: engine.predict_proba(batch), self.repeats, items=len(batch))
+
+    def run(self, only=None, log=print):
+        results = {}
+        for name, bench in self.benchmarks:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            try:
+                results[name] = bench()
+                log(f"{name:<28}{results[name]['median_ms']:>12.3f} ms  ({results[name]['items_per_s']} /s)")
+            except BenchmarkSkipped as e:
+                results[name] = {"skipped": str(e)}
+                log(f"{name:<28}{'omis':>12}     {e}")
+        return results
+
+
+def environment_info():
+    import sklearn
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Raportul median curent / baseline pentru etapele masurate in ambele rulari."""
+    comparison = {}
+    for name, result in current.items():
+        base = baseline.get(name)
+        if not base or "median_ms" not in result or "median_ms" not in base or base["median_ms"] <= 0:
+            continue
+        ratio = result["median_ms"] / base["median_ms"]
+        if abs(result["median_ms"] - base["median_ms"]) < MIN_DELTA_MS:
+            status = "ok"
+        elif ratio > 1 + tolerance:
+            status = "regresie"
+        elif ratio < 1 - tolerance:
+            status = "imbunatatire"
+        else:
+            status = "ok"
+        comparison[name] = {"baseline_ms": base["median_ms"], "current_ms": result["median_ms"],
+                            "ratio": round(ratio, 3), "status": status}
+    return comparison
+
+
+def format_comparison(comparison):
+    lines = [f"{'etapa':<28}{'baseline ms':>14}{'curent ms':>14}{'raport':>9}  status"]
+    for name, row in comparison.items():
+        lines.append(f"{name:<28}{row['baseline_ms']:>14.3f}{row['current_ms']:>14.3f}{row['ratio']:>9.2f}  {row['status']}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark-uri pentru captura, setul de date, antrenare si inferenta.")
+    parser.add_argument("--output", help="fisierul JSON cu rezultatele (implicit doar afisare)")
+    parser.add_argument("--baseline", help="rezultatele unei rulari anterioare; regresiile dau codul de iesire 1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="variatia relativa a medianei acceptata fata de baseline")
+    parser.add_argument("--only", help="prefixe de etape separate prin virgula (ex. predict,model_load)")
+    parser.add_argument("--images", help="director cu imagini reale pentru extragerea landmark-urilor")
+    parser.add_argument("--classes", type=int, default=24)
+    parser.add_argument("--samples-per-class", type=int, default=100)
+    parser.add_argument("--num-images", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--quick", action="store_true", help="date si repetari reduse, pentru o verificare rapida")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.quick:
+        args.samples_per_class, args.num_images, args.repeats = 20, 16, 3
+    only = [prefix.strip() for prefix in args.only.split(",")] if args.only else None
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        suite = BenchmarkSuite(work_dir, args.classes, args.samples_per_class, args.num_images, args.repeats,
+                               args.workers, args.images)
+        results = suite.run(only)
+        report = {"version": BENCHMARK_VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                  "environment": environment_info(), "config": suite.config(), "results": results}
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        if baseline.get("config") != report["config"]:
+            print("Atentie: configuratia difera de cea a baseline-ului; comparatia poate fi inselatoare.")
+        comparison = compare_results(results, baseline.get("results", {}), args.tolerance)
+        report["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "stages": comparison}
+        print(format_comparison(comparison))
+        regressions = [name for name, row in comparison.items() if row["status"] == "regresie"]
+        if regressions:
+            print(f"Regresii: {', '.join(regressions)}")
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Rezultatele au fost salvate in '{args.output}'.")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
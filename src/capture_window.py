@@ -1,22 +1,27 @@
 import os 
 import cv2
 import time
+import threading
 import numpy as np
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QTextEdit, QMessageBox,
-    QWidget, QGridLayout
+    QWidget, QGridLayout, QCheckBox
 )
 from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtCore import (
-    Qt, QTimer, QThread, Signal, Slot,
+    Qt, QThread, Signal, Slot,
     QWaitCondition, QMutex
 )
 
-DATA_DIR = "./data"
+from landmark_cache import CACHE_FILENAME, discard_cached_landmarks
+from image_writer import AsyncImageWriter
+from landmark_store import CaptureLandmarkExtractor, get_landmark_store
+from image_shards import get_image_shard, list_shards, image_filename
+from frame_buffer import FrameRing
+from preview_renderer import PreviewRenderer, PREVIEW_FPS
 
-if not os.path.exists(DATA_DIR):
-    os.makedirs(DATA_DIR)
+DATA_DIR = "./data" # Creat la deschiderea ferestrei (si de ensure_class_dir), nu la import
 
 # Configurari pentru colectarea imaginilor
 collection_modes = [
@@ -32,38 +37,94 @@ def ensure_class_dir(class_id):
         os.makedirs(class_dir)
     return class_dir
 
-def get_existing_images_count(class_id, mode_prefix):
-    class_dir = ensure_class_dir(class_id)
-    count = 0
-    if not os.path.exists(class_dir):
-        return 0
-    for filename in os.listdir(class_dir):
-        if filename.startswith(mode_prefix) and filename.endswith('.jpg') and not filename.endswith('_flipped.jpg'):
-            count += 1
-    return count
-
-def get_next_image_number(class_id, mode_prefix):
-    class_dir = ensure_class_dir(class_id)
-    if not os.path.exists(class_dir):
-        return 0
-    
-    max_num = -1
+def _parse_image_number(filename, mode_prefix):
+    """Numarul unei imagini originale '<prefix>_<n>.jpg' sau None daca fisierul nu apartine modului."""
+    if filename.startswith(mode_prefix) and filename.endswith('.jpg') and not filename.endswith('_flipped.jpg'):
+        try:
+            return int(filename.replace(mode_prefix + '_', '').replace('.jpg', ''))
+        except ValueError:
+            return -1 # Se numara, dar nu influenteaza urmatorul numar
+    return None
+
+
+class ClassImageIndex:
+    """Numarul de imagini si urmatorul numar liber pentru fiecare mod al unei clase.
+
+    Directorul este scanat o singura data, la intrarea in clasa; apoi indexul este
+    actualizat la fiecare imagine salvata si la resetarea unui mod.
+    """
+
+    def __init__(self, class_id):
+        self.class_id = class_id
+        self.class_dir = ensure_class_dir(class_id)
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.next_numbers = {}
+        self.rescan()
+
+    def rescan(self):
+        numbers = {mode["prefix"]: set() for mode in collection_modes}
+        unnumbered = {prefix: 0 for prefix in numbers}
+        for filename in os.listdir(self.class_dir):
+            for prefix in numbers:
+                num = _parse_image_number(filename, prefix)
+                if num is not None and num >= 0:
+                    numbers[prefix].add(num)
+                elif num is not None:
+                    unnumbered[prefix] += 1
+        # Frame-urile capturate doar ca landmark-uri (fara JPEG) se numara si ele
+        store = get_landmark_store(self.class_dir)
+        if store.exists():
+            for prefix in numbers:
+                numbers[prefix] |= store.numbers(prefix)
+        # La fel imaginile salvate in shard-uri
+        for shard in list_shards(self.class_dir):
+            if shard.prefix in numbers:
+                numbers[shard.prefix] |= shard.numbers()
+        with self._lock:
+            self.counts = {prefix: len(nums) + unnumbered[prefix] for prefix, nums in numbers.items()}
+            self.next_numbers = {prefix: max(nums, default=-1) + 1 for prefix, nums in numbers.items()}
+
+    def count(self, mode_prefix):
+        with self._lock:
+            return self.counts.get(mode_prefix, 0)
+
+    def next_number(self, mode_prefix):
+        with self._lock:
+            return self.next_numbers.get(mode_prefix, 0)
+
+    def record_saved(self, mode_prefix, number):
+        with self._lock:
+            self.counts[mode_prefix] = self.counts.get(mode_prefix, 0) + 1
+            self.next_numbers[mode_prefix] = max(self.next_numbers.get(mode_prefix, 0), number + 1)
+
+    def reset_mode(self, mode_prefix):
+        with self._lock:
+            self.counts[mode_prefix] = 0
+            self.next_numbers[mode_prefix] = 0
+
+
+_class_indexes = {}
+_class_indexes_lock = threading.Lock()
+
+def get_class_index(class_id, rescan=False):
+    with _class_indexes_lock:
+        index = _class_indexes.get(class_id)
+        if index is None:
+            index = _class_indexes[class_id] = ClassImageIndex(class_id)
+            return index
+    if rescan:
+        index.rescan()
+    return index
 
-    for filename in os.listdir(class_dir):
-        if filename.startswith(mode_prefix) and filename.endswith('.jpg') and not filename.endswith('_flipped.jpg'):
-            try:
-                num_str = filename.replace(mode_prefix + '_', '').replace('.jpg', '')
-                num = int(num_str)
-                max_num = max(max_num, num)
-            except ValueError:
-                continue
-    return max_num + 1 if max_num != -1 else 0
+def get_existing_images_count(class_id, mode_prefix):
+    return get_class_index(class_id).count(mode_prefix)
 
 def get_total_images_for_class(class_id):
     total = 0
     for mode in collection_modes:
         count = get_existing_images_count(class_id, mode["prefix"])
-        total += count * 2 # Original + Flipped
+        total += count * 2 # Original + oglindit (fisier _flipped.jpg sau augmentare la crearea setului de date)
     return total
 
 def get_class_completion_status(class_id):
@@ -86,13 +147,14 @@ def save_image_with_flip(frame, class_dir, filename_base):
 
 # --- Thread pentru Camera ---
 class CameraThread(QThread):
-    frame_ready = Signal(np.ndarray) # Emite un frame OpenCV (numpy array)
     log_message = Signal(str) # Emite mesaje de log pentru QTextEdit
 
     def __init__(self):
         super().__init__()
         self.running = True
         self.cap = None
+        # Ultimele frame-uri (deja oglindite); consumatorii le citesc in ritmul lor
+        self.frame_ring = FrameRing()
 
     def run(self):
         self.cap = cv2.VideoCapture(0)
@@ -102,11 +164,17 @@ class CameraThread(QThread):
             return
         
         self.log_message.emit("Camera deschisă cu succes!")
+        raw_frame = None # Refolosit la fiecare citire, ca sa nu alocam un array nou per frame
         while self.running:
-            ret, frame = self.cap.read()
+            if raw_frame is None:
+                ret, frame = self.cap.read()
+            else:
+                ret, frame = self.cap.read(raw_frame)
             if ret:
-                frame = cv2.flip(frame, 1)
-                self.frame_ready.emit(frame)
+                raw_frame = frame
+                slot, buffer = self.frame_ring.acquire(frame.shape, frame.dtype)
+                cv2.flip(frame, 1, dst=buffer)
+                self.frame_ring.publish(slot)
             else:
                 self.log_message.emit("Eroare la citirea frame-ului!")
                 time.sleep(0.1) 
@@ -125,13 +193,16 @@ class ImageProcessingThread(QThread):
     log_message = Signal(str)
     status_update = Signal(int, str, int) # (class_id, mode_name, total_images)
     process_finished = Signal(int) # Emite clasa ID cand procesarea este terminata
+    writer_stats = Signal(dict) # Emite contoarele de scriere (queued, written, dropped, failed, pending, skipped)
 
-    def __init__(self):
+    def __init__(self, frame_ring=None):
         super().__init__()
         self.mutex = QMutex()
+        self.save_mutex = QMutex()
         self.wait_condition = QWaitCondition()
         self.is_capturing = False
-        self.current_frame = None
+        self.frame_ring = frame_ring # Sursa de frame-uri (FrameRing-ul camerei)
+        self.last_frame_seq = 0
         self.running = True
 
         # Stari initiale
@@ -140,10 +211,23 @@ class ImageProcessingThread(QThread):
         self.current_mode = collection_modes[self.current_mode_index]
         self.current_count = 0
         self.timer_start = 0
+
+        # Varianta oglindita este generata implicit in spatiul landmark-urilor (landmark_augmentation),
+        # deci _flipped.jpg se scrie doar la cerere
+        self.save_flipped = False
+        # Codarea JPEG si scrierea pe disc se fac pe thread-urile writer-ului
+        self.writer = AsyncImageWriter(save_flipped=self.save_flipped)
+        self.last_writer_stats = 0
+        # Optional: detectia mainii la captura, in LandmarkStore-ul clasei (setul de date devine o concatenare)
+        self.save_images = True
+        self.landmark_extractor = None
+        self.skipped_frames = 0 # Frame-uri respinse pentru ca extractorul de landmark-uri nu tine pasul
     
     def run(self):
         self.log_message.emit("Thread de procesare imagini pornit.")
 
+        # Indexul clasei poate ramane din sesiunea anterioara, iar fisierele se pot schimba intre timp
+        self.rescan_class(self.current_class)
         self.current_count = get_existing_images_count(self.current_class, self.current_mode["prefix"])
         self.log_message.emit(f"Clasa initiala '{self.current_class}' are {self.current_count} imagini.")
         self.status_update.emit(self.current_class, self.current_mode["name"], self.current_count)
@@ -159,16 +243,24 @@ class ImageProcessingThread(QThread):
 
             current_time = time.time()
             if self.is_capturing and (current_time - self.timer_start >= cooldown):
-                if self.current_frame is not None:
+                # Copie proprie a celui mai nou frame; acelasi frame nu este salvat de doua ori
+                latest = self.frame_ring.read_latest(self.last_frame_seq) if self.frame_ring is not None else None
+                if latest is not None:
+                    self.last_frame_seq, frame = latest
+                    self.save_mutex.lock() # Resetarea modului nu trebuie sa intervina intre alegerea numelui si submit
                     try:
-                        class_dir = ensure_class_dir(self.current_class)
-                        next_img_num = get_next_image_number(self.current_class, self.current_mode["prefix"])
-                        filename_base = f"{self.current_mode['prefix']}_{next_img_num}"
-
-                        original_path, flipped_path = save_image_with_flip(self.current_frame, class_dir, filename_base)
-                        self.current_count += 1
-                        self.log_message.emit(f"Imagine salvata: {original_path} si {flipped_path}")
-                        self.status_update.emit(self.current_class, self.current_mode["name"], self.current_count)
+                        index = get_class_index(self.current_class)
+                        prefix = self.current_mode["prefix"]
+                        image_number = index.next_number(prefix)
+                        class_dir = index.class_dir
+                        filename_base = f"{prefix}_{image_number}"
+
+                        # Frame-ul e doar pus in coada; daca writer-ul e plin, incercam din nou la urmatorul pas
+                        if self.submit_frame(frame, class_dir, prefix, image_number):
+                            index.record_saved(prefix, image_number)
+                            self.current_count += 1
+                            self.log_message.emit(f"Frame trimis la salvare: {os.path.join(class_dir, filename_base)}")
+                            self.status_update.emit(self.current_class, self.current_mode["name"], self.current_count)
 
                         if self.current_count >= batch_size:
                             self.log_message.emit(f"Mod '{self.current_mode['name']}' completat pentru clasa {self.current_class}.")
@@ -190,18 +282,93 @@ class ImageProcessingThread(QThread):
 
                     except Exception as e:
                         self.log_message.emit(f"Eroare la salvarea imaginii: {str(e)}")
+                    finally:
+                        self.save_mutex.unlock()
                     self.timer_start = current_time
-                else:
+                    self.emit_writer_stats()
+                elif self.last_frame_seq == 0:
                     self.log_message.emit("Asteapta un frame de la camera...")
                     time.sleep(0.01)
             time.sleep(0.001)  # Previne utilizarea excesiva a CPU
     
 
-    @Slot(np.ndarray)
-    def receive_frame(self, frame):
-        """Slot pentru a primi frame-uri de la CameraThread"""
-        self.current_frame = frame
-    
+    def submit_frame(self, frame, class_dir, prefix, image_number):
+        """Trimite frame-ul la writer si/sau la extractorul de landmark-uri; False daca o coada e plina.
+
+        Un frame respins de writer este numarat in contorul lui `dropped`, iar unul respins
+        de extractor in skipped_frames.
+        """
+        extractor = self.landmark_extractor
+        if extractor is not None and not extractor.has_room():
+            self.skipped_frames += 1
+            return False
+        if self.save_images and not self.writer.submit(frame, class_dir, f"{prefix}_{image_number}"):
+            return False
+        # Un singur producator: dupa verificarea de mai sus, coada extractorului nu se poate umple intre timp
+        if extractor is not None:
+            extractor.submit(frame, class_dir, prefix, image_number)
+        return True
+
+    def set_landmark_extraction(self, enabled):
+        if enabled and self.landmark_extractor is None:
+            self.landmark_extractor = CaptureLandmarkExtractor(extract_flipped=self.save_flipped)
+            self.log_message.emit("Extragerea landmark-urilor la captura este activa.")
+        elif not enabled and self.landmark_extractor is not None:
+            self.save_mutex.lock() # Nu scoatem extractorul in timpul unui submit_frame
+            try:
+                extractor, self.landmark_extractor = self.landmark_extractor, None
+            finally:
+                self.save_mutex.unlock()
+            extractor.close() # Frame-urile deja acceptate sunt procesate
+            self.save_images = True # Fara extractor, imaginile sunt singura iesire
+            self.log_message.emit("Extragerea landmark-urilor la captura a fost oprita.")
+
+    def set_save_flipped(self, enabled):
+        self.save_flipped = enabled
+        self.writer.save_flipped = enabled
+        if self.landmark_extractor is not None:
+            self.landmark_extractor.extract_flipped = enabled
+
+    def set_image_storage(self, use_shards):
+        # Se aplica frame-urilor scrise de acum inainte; cele deja salvate raman unde sunt
+        self.writer.use_shards = use_shards
+        self.log_message.emit("Imaginile sunt salvate in shard-uri." if use_shards
+                              else "Imaginile sunt salvate ca fisiere JPEG separate.")
+
+    def set_save_images(self, enabled):
+        # Cel putin o iesire trebuie sa ramana activa
+        self.save_images = enabled or self.landmark_extractor is None
+        return self.save_images
+
+    def emit_writer_stats(self, force=False):
+        now = time.time()
+        if force or now - self.last_writer_stats >= 0.2:
+            self.last_writer_stats = now
+            stats = self.writer.stats()
+            stats["skipped"] = self.skipped_frames
+            if self.landmark_extractor is not None:
+                stats["landmarks"] = self.landmark_extractor.stats()
+            self.writer_stats.emit(stats)
+
+    def flush_writes(self):
+        """Asteapta scrierea pe disc a tuturor imaginilor (si landmark-urilor) din coada."""
+        self.writer.flush()
+        if self.landmark_extractor is not None:
+            self.landmark_extractor.flush()
+        self.emit_writer_stats(force=True)
+
+    def rescan_class(self, class_id):
+        """Rescaneaza clasa dupa ce scrierile din coada au ajuns pe disc.
+
+        Altfel numerele frame-urilor inca nescrise ar fi refolosite si fisierele lor suprascrise.
+        """
+        self.save_mutex.lock()
+        try:
+            self.flush_writes()
+            get_class_index(class_id, rescan=True)
+        finally:
+            self.save_mutex.unlock()
+
     def start_capture(self):
         self.mutex.lock()
         self.is_capturing = True
@@ -231,6 +398,7 @@ class ImageProcessingThread(QThread):
     def next_class(self):
         self.stop_capture()
         self.current_class += 1
+        self.rescan_class(self.current_class) # Scanam directorul o data, la intrarea in clasa
         self.current_mode_index = 0
         self.current_mode = collection_modes[self.current_mode_index]
         self.current_count = get_existing_images_count(self.current_class, self.current_mode["prefix"])
@@ -244,6 +412,7 @@ class ImageProcessingThread(QThread):
         
         if self.current_class > 0:
             self.current_class -= 1
+            self.rescan_class(self.current_class) # Scanam directorul o data, la intrarea in clasa
             self.current_mode_index = 0
             self.current_mode = collection_modes[self.current_mode_index]
             self.current_count = get_existing_images_count(self.current_class, self.current_mode["prefix"])
@@ -258,12 +427,34 @@ class ImageProcessingThread(QThread):
         self.stop_capture()
         class_dir = ensure_class_dir(self.current_class)
         prefix = self.current_mode["prefix"]
-        deleted_count = 0
-        if os.path.exists(class_dir):
-            for filename in os.listdir(class_dir):
-                if filename.startswith(prefix) and filename.endswith('.jpg'):
-                    os.remove(os.path.join(class_dir, filename))
-                    deleted_count += 1
+        deleted_paths = []
+        removed_landmarks = 0
+        self.save_mutex.lock()
+        try:
+            self.flush_writes() # Altfel scrierile ramase in coada ar recrea fisiere dupa stergere
+            if os.path.exists(class_dir):
+                for filename in os.listdir(class_dir):
+                    if filename.startswith(prefix) and filename.endswith('.jpg'):
+                        os.remove(os.path.join(class_dir, filename))
+                        deleted_paths.append(os.path.join(class_dir, filename))
+            removed_landmarks = get_landmark_store(class_dir).remove_mode(prefix)
+            # Imaginile din shard au in cache cheia <mod>.shard/<nume fisier>
+            shard = get_image_shard(class_dir, prefix)
+            deleted_paths.extend(os.path.join(shard.data_path, image_filename(prefix, e["number"], e["flipped"]))
+                                 for e in shard.entries())
+            shard.remove()
+            get_class_index(self.current_class).reset_mode(prefix)
+        finally:
+            self.save_mutex.unlock()
+        deleted_count = len(deleted_paths)
+        if removed_landmarks:
+            self.log_message.emit(f"Au fost sterse {removed_landmarks} randuri de landmark-uri.")
+
+        # Landmark-urile imaginilor sterse nu mai trebuie refolosite la crearea setului de date
+        try:
+            discard_cached_landmarks(deleted_paths, os.path.join(DATA_DIR, CACHE_FILENAME))
+        except Exception as e:
+            self.log_message.emit(f"Eroare la actualizarea cache-ului de landmark-uri: {str(e)}")
         
         self.current_count = 0
         self.log_message.emit(f"Toate imaginile pentru modul '{self.current_mode['name']}' au fost sterse.")
@@ -284,6 +475,15 @@ class ImageProcessingThread(QThread):
         self.running = False
         self.wait_condition.wakeAll()
         self.wait()
+        # Toate imaginile acceptate in coada ajung pe disc inainte de inchidere
+        self.writer.close()
+        stats = self.writer.stats()
+        self.log_message.emit(f"Imagini scrise: {stats['written']}, aruncate: {stats['dropped']}, erori: {stats['failed']}, "
+                              f"sarite (extractor ocupat): {self.skipped_frames}.")
+        if self.landmark_extractor is not None:
+            self.landmark_extractor.close()
+            stats = self.landmark_extractor.stats()
+            self.log_message.emit(f"Landmark-uri salvate: {stats['extracted']}, fara mana: {stats['no_hand']}, erori: {stats['failed']}.")
 
 class CaptureWindow(QDialog):
 
@@ -297,7 +497,9 @@ class CaptureWindow(QDialog):
     
 
         self.camera_thread = CameraThread()
-        self.processing_thread = ImageProcessingThread()
+        self.processing_thread = ImageProcessingThread(self.camera_thread.frame_ring)
+        # Previzualizarea citeste ultimul frame din inel si il pregateste in afara thread-ului GUI
+        self.preview_renderer = PreviewRenderer(640, 480, PREVIEW_FPS, self.camera_thread.frame_ring)
 
         self.init_ui()
         
@@ -305,13 +507,15 @@ class CaptureWindow(QDialog):
 
         self.processing_thread.start()
         self.camera_thread.start()
+        self.preview_renderer.start()
 
         if not os.path.exists(DATA_DIR):
             os.makedirs(DATA_DIR)
 
         self.log_text.append("Sistem de captura pentru setul de date.")
-        self.log_text.append(f"Pentru fiecare clasa se vor colect {batch_size * 2} imagini (originale + flip) per mod.")
-        self.log_text.append("TOTAL: 4000 imagini per clasa.")
+        self.log_text.append(f"Pentru fiecare clasa se vor colecta {batch_size} imagini per mod; varianta oglindita "
+                             "este generata la crearea setului de date.")
+        self.log_text.append(f"TOTAL: {batch_size * len(collection_modes) * 2} exemple per clasa (originale + oglindite).")
         self.log_text.append("\nFoloseste butoanele de control de mai jos.")
 
     def init_ui(self):
@@ -331,6 +535,7 @@ class CaptureWindow(QDialog):
         self.status_class_label = QLabel(f"Clasa: {self.processing_thread.current_class}")
         self.status_mode_label = QLabel(f"Mod: {self.processing_thread.current_mode['name']}")
         self.status_count_label = QLabel(f"Imagini: {self.processing_thread.current_count}/{batch_size}")
+        self.status_writer_label = QLabel(f"Scriere: 0/{self.processing_thread.writer.capacity} in coada")
 
         status_layout.addWidget(self.status_capture_label)
         status_layout.addStretch(1)
@@ -339,6 +544,8 @@ class CaptureWindow(QDialog):
         status_layout.addWidget(self.status_mode_label)
         status_layout.addStretch(1)
         status_layout.addWidget(self.status_count_label)
+        status_layout.addStretch(1)
+        status_layout.addWidget(self.status_writer_label)
 
     
         main_layout.addLayout(status_layout)
@@ -378,29 +585,45 @@ class CaptureWindow(QDialog):
 
         main_layout.addLayout(controls_layout)
 
+        # Iesirile capturii: imaginile JPEG (pentru audit / re-extragere) si/sau landmark-urile
+        outputs_layout = QHBoxLayout()
+        self.landmarks_checkbox = QCheckBox("Extrage landmark-uri la captura")
+        self.landmarks_checkbox.setToolTip("Detectia mainii ruleaza in fundal; crearea setului de date doar concateneaza rezultatele")
+        self.landmarks_checkbox.toggled.connect(self.on_landmarks_toggled)
+        outputs_layout.addWidget(self.landmarks_checkbox)
+        self.images_checkbox = QCheckBox("Salveaza imagini JPEG")
+        self.images_checkbox.setChecked(True)
+        self.images_checkbox.setEnabled(False) # Activ doar cand landmark-urile sunt extrase
+        self.images_checkbox.toggled.connect(self.on_images_toggled)
+        outputs_layout.addWidget(self.images_checkbox)
+        self.flipped_checkbox = QCheckBox("Salveaza si varianta oglindita (_flipped)")
+        self.flipped_checkbox.setToolTip("Nu este necesara: oglindirea se face pe landmark-uri la crearea setului de date")
+        self.flipped_checkbox.setChecked(self.processing_thread.save_flipped)
+        self.flipped_checkbox.toggled.connect(self.processing_thread.set_save_flipped)
+        outputs_layout.addWidget(self.flipped_checkbox)
+        self.shards_checkbox = QCheckBox("Salveaza imaginile in shard-uri")
+        self.shards_checkbox.setToolTip("Un singur fisier per mod (<mod>.shard) in loc de cate un JPEG per frame")
+        self.shards_checkbox.toggled.connect(self.processing_thread.set_image_storage)
+        outputs_layout.addWidget(self.shards_checkbox)
+        outputs_layout.addStretch(1)
+        main_layout.addLayout(outputs_layout)
+
         self.setLayout(main_layout)
     
     def connect_threads(self):
         # Conecteaza semnalele camerei la sloturile GUI-ului
-        self.camera_thread.frame_ready.connect(self.display_frame)
         self.camera_thread.log_message.connect(self.log_text.append)
+        self.preview_renderer.image_ready.connect(self.display_image)
 
         # Conecteaza semnalele de procesare la sloturile GUI-ului
         self.processing_thread.log_message.connect(self.log_text.append)
         self.processing_thread.status_update.connect(self.update_status_labels)
         self.processing_thread.process_finished.connect(self.on_process_finished)
+        self.processing_thread.writer_stats.connect(self.update_writer_status)
 
-        # Conecteaza frame-urile de la camera la thread-ul de procesare
-        self.camera_thread.frame_ready.connect(self.processing_thread.receive_frame)
-    
-    @Slot(np.ndarray)
-    def display_frame(self, frame):
-        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-        p = convert_to_Qt_format.scaled(self.camera_label.width(), self.camera_label.height(), Qt.AspectRatioMode.KeepAspectRatio)
-        self.camera_label.setPixmap(QPixmap.fromImage(p))
+    @Slot(QImage)
+    def display_image(self, image):
+        self.camera_label.setPixmap(QPixmap.fromImage(image))
     
     @Slot(np.ndarray)
     def update_status_labels(self, current_class, current_mode_name, current_count):
@@ -409,6 +632,30 @@ class CaptureWindow(QDialog):
         self.status_count_label.setText(f"Imagini: {current_count}/{batch_size}")  
         self.status_capture_label.setText("Stare: Captura" if self.processing_thread.is_capturing else "Stare: Pauza") 
 
+    @Slot(bool)
+    def on_landmarks_toggled(self, enabled):
+        self.processing_thread.set_landmark_extraction(enabled)
+        self.images_checkbox.setEnabled(enabled)
+        if not enabled:
+            self.images_checkbox.setChecked(True)
+
+    @Slot(bool)
+    def on_images_toggled(self, enabled):
+        self.processing_thread.set_save_images(enabled)
+
+    @Slot(dict)
+    def update_writer_status(self, stats):
+        capacity = self.processing_thread.writer.capacity
+        text = f"Scriere: {stats['pending']}/{capacity} in coada | scrise {stats['written']} | aruncate {stats['dropped']}"
+        if stats.get("skipped"):
+            text += f" | sarite {stats['skipped']}"
+        if "landmarks" in stats:
+            landmarks = stats["landmarks"]
+            text += f" | landmark-uri {landmarks['extracted']} (fara mana {landmarks['no_hand']}, in coada {landmarks['pending']})"
+        self.status_writer_label.setText(text)
+        # Coada aproape plina: discul nu tine pasul cu rata de captura
+        self.status_writer_label.setStyleSheet("color: orange;" if stats['pending'] >= capacity * 0.75 else "")
+
     def toggle_capture(self):
         if self.processing_thread.is_capturing:
             self.processing_thread.stop_capture()
@@ -429,8 +676,9 @@ class CaptureWindow(QDialog):
                                      QMessageBox.StandardButton.No)
         
         if reply == QMessageBox.StandardButton.Yes:
+            self.preview_renderer.stop()
             self.camera_thread.stop()
-            self.processing_thread.shutdown()
+            self.processing_thread.shutdown() # Asteapta si scrierea imaginilor ramase in coada
             event.accept()
             self.collection_finished.emit()
         else:
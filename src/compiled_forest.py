@@ -0,0 +1,112 @@
+import numpy as np
+
+
+class CompiledForest:
+    """Padure aleatoare aplatizata in array-uri NumPy contigue.
+
+    Nodurile tuturor arborilor sunt concatenate; frunzele au ambii copii indicand
+    spre ele insele, astfel ca parcurgerea vectorizata poate face un numar fix de pasi.
+    Se incarca fara sklearn si are aceeasi interfata de predictie ca RandomForestClassifier.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right, value, roots,
+                 max_depth, classes, n_features_in, children=None, metadata=None):
+        # Copiii fiecarui nod intercalati (dreapta, stanga): urmatorul nod este _children[2 * nod + go_left].
+        # Daca sunt dati deja intercalati (ex. memory-mapped din model_artifact), nu se mai copiaza.
+        if children is None:
+            children = np.stack([children_right, children_left], axis=1).ravel().astype(np.int64)
+        if children_left is None:
+            children_left, children_right = children[1::2], children[0::2]
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value # (n_noduri, n_clase) distributia claselor, deja normalizata
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features_in)
+        self.metadata = metadata or {} # Parametrii antrenarii, amprenta setului de date etc.
+        self._children = children
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X):
+        """Intoarce indecsii globali ai frunzelor, forma (n_randuri, n_arbori)."""
+        X = np.asarray(X, dtype=np.float32) # La fel ca sklearn, comparam valori float32 cu praguri float64
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Se asteapta {self.n_features_in_} caracteristici, dar s-au gasit {X.shape[1]}")
+
+        # Indexare pe vectorul aplatizat, mai rapida decat indexarea 2D X[rows, feature]
+        flat_X = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(X.shape[0], dtype=np.int64) * X.shape[1])[:, np.newaxis]
+        nodes = np.tile(self.roots.astype(np.int64), (X.shape[0], 1))
+        for _ in range(self.max_depth):
+            go_left = flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self._children[2 * nodes + go_left]
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], len(self.classes_)), dtype=np.float64)
+        # Adunam arbore cu arbore, in ordinea din sklearn, ca rezultatul sa fie identic bit cu bit
+        for t in range(leaves.shape[1]):
+            proba += self.value[leaves[:, t]]
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def _tree_class_distribution(tree):
+    """Distributia claselor pe noduri, exact cum o intoarce DecisionTreeClassifier.predict_proba."""
+    value = tree.value[:, 0, :].astype(np.float64)
+    # Versiunile noi de sklearn pastreaza deja fractii (radacina insumeaza 1) si le intorc direct;
+    # cele vechi pastreaza numarari si le normalizeaza la predictie
+    if abs(value[0].sum() - 1.0) < 1e-9:
+        return value
+    normalizer = value.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return value / normalizer
+
+
+def compile_forest(model):
+    """Aplatizeaza un RandomForestClassifier antrenat (o singura iesire) intr-un CompiledForest."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Doar modelele cu o singura iesire pot fi compilate.")
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        node_ids = np.arange(offset, offset + n, dtype=np.int32)
+        is_leaf = tree.children_left == -1
+
+        # Frunzele trimit spre ele insele, cu o caracteristica valida si prag arbitrar
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32))
+        values.append(_tree_class_distribution(tree))
+        roots.append(offset)
+
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    return CompiledForest(
+        np.concatenate(features), np.concatenate(thresholds),
+        np.concatenate(lefts), np.concatenate(rights),
+        np.ascontiguousarray(np.concatenate(values)), np.asarray(roots, dtype=np.int32),
+        max_depth, model.classes_, model.n_features_in_
+    )
@@ -0,0 +1,102 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from hand_features import FEATURE_COLUMNS
+
+# Formatul binar al setului de date: trei fisiere cu acelasi prefix
+#   <prefix>.features.npy - matrice float32 (N, 63), se poate incarca prin memory-map
+#   <prefix>.labels.npy   - vector int32 (N,) cu indexul clasei fiecarui rand
+#   <prefix>.meta.json    - tabela cu numele claselor si coloanele caracteristicilor
+DATASET_PREFIX = "dataset"
+DATASET_CSV = "dataset.csv" # Formatul vechi, pastrat pentru compatibilitate
+FORMAT_VERSION = 1
+
+
+def dataset_paths(prefix=DATASET_PREFIX):
+    return f"{prefix}.features.npy", f"{prefix}.labels.npy", f"{prefix}.meta.json"
+
+
+def dataset_exists(prefix=DATASET_PREFIX):
+    return all(os.path.exists(path) for path in dataset_paths(prefix))
+
+
+def _save_npy(path, array):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as fh:
+        np.save(fh, array)
+    os.replace(tmp_path, path)
+
+
+def save_dataset(features, labels, class_names, prefix=DATASET_PREFIX):
+    """Salveaza setul de date in format binar. labels contine indecsi in class_names."""
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    labels = np.ascontiguousarray(labels, dtype=np.int32)
+    if features.ndim != 2 or features.shape[0] != labels.shape[0]:
+        raise ValueError(f"Dimensiuni incompatibile: caracteristici {features.shape}, etichete {labels.shape}")
+
+    features_path, labels_path, meta_path = dataset_paths(prefix)
+    _save_npy(features_path, features)
+    _save_npy(labels_path, labels)
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "num_samples": int(features.shape[0]),
+        "columns": FEATURE_COLUMNS if features.shape[1] == len(FEATURE_COLUMNS) else None,
+        "class_names": [str(name) for name in class_names],
+    }
+    # Fisierul meta este scris ultimul, deci existenta lui marcheaza un set de date complet
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def load_dataset(prefix=DATASET_PREFIX, mmap=True):
+    """Intoarce (features, labels, class_names); features este memory-mapped daca mmap=True."""
+    features_path, labels_path, meta_path = dataset_paths(prefix)
+    with open(meta_path, 'r', encoding='utf-8') as fh:
+        meta = json.load(fh)
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Versiune necunoscuta a setului de date: {meta.get('version')}")
+
+    features = np.load(features_path, mmap_mode='r' if mmap else None)
+    labels = np.load(labels_path)
+    if features.shape[0] != labels.shape[0]:
+        raise ValueError("Fisierele setului de date au un numar diferit de randuri.")
+    if meta.get("columns") != FEATURE_COLUMNS:
+        raise ValueError("Setul de date nu foloseste formatul de caracteristici din hand_features.")
+    return features, labels, meta["class_names"]
+
+
+def export_dataset_csv(path, features, labels, class_names):
+    df = pd.DataFrame(np.asarray(features), columns=FEATURE_COLUMNS)
+    df['label'] = np.asarray(class_names, dtype=object)[np.asarray(labels)]
+    df.to_csv(path, index=False)
+
+
+def load_dataset_csv(path=DATASET_CSV):
+    """Citeste un CSV in formatul vechi si il intoarce in aceeasi forma ca load_dataset."""
+    df = pd.read_csv(path)
+    if 'label' not in df.columns:
+        raise ValueError(f"Coloana 'label' nu exista in '{path}'.")
+    missing = [col for col in FEATURE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Lipsesc coloanele {missing[:3]} din '{path}'.")
+    features = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32) # Ordinea din hand_features
+    class_names, labels = np.unique(df['label'].astype(str).values, return_inverse=True)
+    return features, labels.astype(np.int32), class_names.tolist()
+
+
+def labels_from_indices(labels, class_names):
+    """Transforma indecsii in etichetele folosite la antrenare.
+
+    Clasele sunt directoarele '0', '1', ... din ./data, iar InferenceWorker se asteapta
+    la etichete intregi, deci numele numerice sunt convertite la int.
+    """
+    if all(str(name).lstrip('-').isdigit() for name in class_names):
+        names = np.array([int(name) for name in class_names])
+    else:
+        names = np.array(class_names)
+    return names[np.asarray(labels)]
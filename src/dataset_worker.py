@@ -1,25 +1,50 @@
 import os
-import pandas as pd
+import numpy as np
 import mediapipe as mp
-import cv2
 from PySide6.QtCore import QThread, Signal
 
+from landmark_cache import LandmarkCache, CACHE_FILENAME
+from dataset_io import save_dataset, export_dataset_csv, DATASET_PREFIX, DATASET_CSV
+from hand_features import NUM_FEATURES
+from landmark_store import LandmarkStore, record_filename
+from landmark_augmentation import augment_dataset
+from image_shards import ShardImageRef, list_shards, image_filename, load_image_source
+from landmark_extraction import (
+    EXTRACT_OK, EXTRACT_NO_HAND, EXTRACT_READ_ERROR,
+    create_hands_detector, iter_extract_serial, iter_extract_parallel
+)
+
+
 class DatasetCreationWorker(QThread):
     log_message = Signal(str)
     progress_update = Signal(int) #Emite procentul de progres
     finished = Signal(bool, str) # Emite (succes, mesaj)
 
-    def __init__(self):
+    def __init__(self, num_workers=None, chunk_size=32):
         super().__init__()
+        # Numarul de procese pentru extragere; implicit toate nucleele mai putin unul (pentru GUI)
+        if num_workers is None:
+            num_workers = max(1, (os.cpu_count() or 1) - 1)
+        self.num_workers = max(1, int(num_workers))
+        self.chunk_size = max(1, int(chunk_size)) # Imagini trimise unui proces intr-o singura sarcina
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.3)
+        # In modul serial folosim un singur detector in acest thread
+        self.hands = create_hands_detector() if self.num_workers == 1 else None
         self.DATA_DIR = "./data" # Directorul cu imaginile colectate
+        self.use_cache = True # Refolosim landmark-urile imaginilor nemodificate de la ultima rulare
+        self.use_landmark_stores = True # Landmark-urile extrase la captura sunt concatenate direct
+        # Augmentare in spatiul landmark-urilor: oglindirea inlocuieste imaginile _flipped.jpg
+        # (care sunt ignorate), rotatia si scalarea adauga variante aleatoare
+        self.mirror_augmentation = True
+        self.augment_rotation_deg = 0.0
+        self.augment_scale_jitter = 0.0
+        self.augment_copies = 1
+        self.dataset_prefix = DATASET_PREFIX # Setul de date binar citit de ModelTrainingWorker
+        self.export_csv = False # Scrie si 'dataset.csv' in formatul vechi
         self.running = True
-    
+
     def run(self):
         self.log_message.emit("Incepem crearea dataset-ului...")
-        data = []
-        labels = []
 
         try:
             # Ne asiguram ca DATA_DIR exista si nu este gol
@@ -28,83 +53,195 @@ class DatasetCreationWorker(QThread):
                 return
 
             class_dirs = [d for d in os.listdir(self.DATA_DIR) if os.path.isdir(os.path.join(self.DATA_DIR, d))]
-            
+
             if not class_dirs:
                 self.finished.emit(False, "Nu s-au gasit clase in directorul de date.")
                 return
-            
-            total_images_to_process = 0
-            for d in class_dirs:
-                total_images_to_process += len([f for f in os.listdir(os.path.join(self.DATA_DIR,d)) if f.endswith('.jpg')])
 
-            if total_images_to_process == 0:
-                self.finished.emit(False, "Nu exista imagini in directorul specificat.")
-                return    
-            
-            processed_images_count = 0
+            class_index = {name: i for i, name in enumerate(class_dirs)}
+
+            # Landmark-urile salvate la captura; imaginile lor nu mai trec prin MediaPipe
+            stored_features, stored_labels, covered = self._read_landmark_stores(class_dirs, class_index)
 
+            # Lista ordonata de sarcini (clasa, fisier, cale, sursa); ordinea rezultatelor o urmeaza pe aceasta.
+            # Sursa este calea JPEG-ului sau o imagine dintr-un shard (citita secvential, la nevoie).
+            tasks = []
             for dir_name in class_dirs:
-                if not self.running: # Verificam daca thread-ul ar trebui sa se opreasca
-                    self.finished.emit(False, "Procesare set de date intrerupta.")
-                    return
-                
                 current_class_path = os.path.join(self.DATA_DIR, dir_name)
+                for shard in list_shards(current_class_path):
+                    entries = shard.entries()
+                    generation = shard.generation() if len(entries) else None
+                    for entry in entries:
+                        img_filename = image_filename(shard.prefix, entry["number"], entry["flipped"])
+                        if (dir_name, img_filename) in covered or (self.mirror_augmentation and entry["flipped"]):
+                            continue
+                        covered.add((dir_name, img_filename)) # Un JPEG cu acelasi nume ar fi un duplicat
+                        tasks.append((dir_name, img_filename, os.path.join(shard.data_path, img_filename),
+                                      ShardImageRef(shard, entry, generation)))
 
-                image_files = sorted([f for f in os.listdir(current_class_path) if f.endswith('.jpg')])
-
+                image_files = sorted([f for f in os.listdir(current_class_path)
+                                      if f.endswith('.jpg') and (dir_name, f) not in covered
+                                      and not (self.mirror_augmentation and f.endswith('_flipped.jpg'))])
                 for img_filename in image_files:
-                    if not self.running:
+                    full_img_path = os.path.join(current_class_path, img_filename)
+                    tasks.append((dir_name, img_filename, full_img_path, full_img_path))
+
+            total_images_to_process = len(tasks)
+            if total_images_to_process == 0 and not covered:
+                self.finished.emit(False, "Nu exista imagini in directorul specificat.")
+                return
+
+            # Matricea finala este alocata o singura data; randurile fara mana detectata sunt taiate la final
+            num_stored = stored_features.shape[0]
+            features = np.empty((num_stored + total_images_to_process, NUM_FEATURES), dtype=np.float32)
+            labels = np.empty(num_stored + total_images_to_process, dtype=np.int32)
+            features[:num_stored] = stored_features
+            labels[:num_stored] = stored_labels
+            num_samples = num_stored
+
+            cache = LandmarkCache(os.path.join(self.DATA_DIR, CACHE_FILENAME))
+            if self.use_cache:
+                cache.load()
+
+            # Cautam fiecare imagine in cache; doar cele noi sau modificate ajung la MediaPipe
+            cached_results = []
+            img_stats = []
+            miss_sources = []
+            for _, _, full_img_path, source in tasks:
+                if isinstance(source, ShardImageRef):
+                    stat = source.shard.entry_stat(source.entry, source.generation)
+                else:
+                    stat = os.stat(full_img_path)
+                hit, data_aux = cache.lookup(full_img_path, stat)
+                img_stats.append(stat)
+                if hit:
+                    cached_results.append((EXTRACT_OK if data_aux is not None else EXTRACT_NO_HAND, data_aux))
+                else:
+                    cached_results.append(None)
+                    miss_sources.append(source)
+
+            self.log_message.emit(f"Cache landmark-uri: {cache.hits} imagini refolosite, {cache.misses} de procesat.")
+            self.log_message.emit(f"Extragere landmark-uri din {len(miss_sources)} imagini cu {self.num_workers} procese.")
+
+            processed_images_count = 0
+            last_progress = -1
+            # Sarcinile sunt ordonate pe clase: un singur mesaj de log per clasa, nu unul per imagine
+            current_class = None
+            class_counts = [0, 0] # (procesate, fara mana detectata) pentru current_class
+            # Octetii din shard-uri sunt cititi abia cand bucata lor este trimisa la procesare
+            images = (load_image_source(source) for source in miss_sources)
+            if self.num_workers > 1:
+                results = self._iter_parallel(images)
+            else:
+                results = self._iter_serial(images)
+
+            try:
+                for i, (dir_name, img_filename, full_img_path, _) in enumerate(tasks):
+                    if not self.running: # Verificam daca thread-ul ar trebui sa se opreasca
                         self.finished.emit(False, "Procesare set de date intrerupta.")
                         return
 
-                    full_img_path = os.path.join(current_class_path, img_filename)
-                    img = cv2.imread(full_img_path)
-                    if img is None:
+                    if dir_name != current_class:
+                        if current_class is not None:
+                            self._log_class_summary(current_class, *class_counts)
+                        current_class = dir_name
+                        class_counts = [0, 0]
+
+                    if cached_results[i] is not None:
+                        status, data_aux = cached_results[i]
+                    else:
+                        status, data_aux = next(results)
+                        if status != EXTRACT_READ_ERROR:
+                            cache.store(full_img_path, img_stats[i], data_aux)
+
+                    if status == EXTRACT_READ_ERROR:
                         self.log_message.emit(f"Nu s-a putut incarca imaginea: {full_img_path}")
                         continue
-                    
-                    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                    results = self.hands.process(img_rgb)
-
-                    if results.multi_hand_landmarks:
-                        hand_landmarks = results.multi_hand_landmarks[0]
-                        data_aux = []
-
-                        base_x = hand_landmarks.landmark[0].x
-                        base_y = hand_landmarks.landmark[0].y
-                        base_z = hand_landmarks.landmark[0].z
-
-                        for lm in hand_landmarks.landmark:
-                            x = lm.x - base_x
-                            y = lm.y - base_y
-                            z = lm.z - base_z
-                            data_aux.extend([x, y, z])
-                        
-                        data.append(data_aux)
-                        labels.append(dir_name)
+
+                    if status == EXTRACT_OK:
+                        features[num_samples] = data_aux
+                        labels[num_samples] = class_index[dir_name]
+                        num_samples += 1
                     else:
-                        self.log_message.emit(f"Avertizare: Nu s-au detectat maini in imaginea {img_filename}.")
-                    
+                        class_counts[1] += 1
+
+                    class_counts[0] += 1
                     processed_images_count += 1
-                    if total_images_to_process > 0:
-                        progress = int((processed_images_count / total_images_to_process) * 100)
+                    progress = int((processed_images_count / total_images_to_process) * 100)
+                    if progress != last_progress: # Evitam sute de mii de semnale identice
+                        last_progress = progress
                         self.progress_update.emit(progress)
-                    
-                    self.log_message.emit(f"Procesat: {img_filename} din clasa '{dir_name}'.")
-            
-            if not data:
+
+                if current_class is not None:
+                    self._log_class_summary(current_class, *class_counts)
+            finally:
+                results.close() # Anuleaza sarcinile ramase in pool la oprire sau eroare
+                # Salvam si rezultatele partiale, ca o rulare intrerupta sa nu fie pierduta
+                if self.use_cache:
+                    cache.retain([full_img_path for _, _, full_img_path, _ in tasks])
+                    if cache.dirty:
+                        cache.save()
+
+            if num_samples == 0:
                 self.finished.emit(False, "Nu s-au putut extrage date din imagini")
                 return
-            
-            columns = [f"{coord}{i}" for i in range(21) for coord in ['x', 'y', 'z']]
-            df = pd.DataFrame(data, columns=columns)
-            df['label'] = labels
 
-            df.to_csv('datasetpo.csv', index=False)
+            features = features[:num_samples]
+            labels = labels[:num_samples]
+
+            if self.mirror_augmentation or self.augment_rotation_deg > 0 or self.augment_scale_jitter > 0:
+                features, labels = augment_dataset(
+                    features, labels, mirror=self.mirror_augmentation, rotation_deg=self.augment_rotation_deg,
+                    scale_jitter=self.augment_scale_jitter, copies=self.augment_copies)
+                self.log_message.emit(f"Augmentare landmark-uri: {num_samples} exemple extrase, {features.shape[0]} dupa augmentare.")
+            save_dataset(features, labels, class_dirs, self.dataset_prefix)
+            self.log_message.emit(f"Set de date salvat: {features.shape[0]} exemple, {len(class_dirs)} clase.")
+
+            if self.export_csv:
+                export_dataset_csv(DATASET_CSV, features, labels, class_dirs)
+                self.log_message.emit(f"Set de date exportat si in '{DATASET_CSV}'.")
 
             self.finished.emit(True, "Setul de date a fost creat cu succes. ")
         except Exception as e:
             self.finished.emit(False, f"A aparut o eroare la crearea setului de date: {str(e)}")
-    
+
+    def _log_class_summary(self, dir_name, processed, no_hand):
+        message = f"Procesat: {processed} imagini din clasa '{dir_name}'."
+        if no_hand:
+            message += f" Avertizare: in {no_hand} nu s-au detectat maini."
+        self.log_message.emit(message)
+
+    def _read_landmark_stores(self, class_dirs, class_index):
+        """Concateneaza LandmarkStore-urile claselor.
+
+        Intoarce (features, labels, acoperite), unde acoperite sunt perechile (clasa, fisier JPEG)
+        deja reprezentate in store (cu sau fara mana detectata).
+        """
+        features, labels, covered = [], [], set()
+        if self.use_landmark_stores:
+            for dir_name in class_dirs:
+                store = LandmarkStore(os.path.join(self.DATA_DIR, dir_name))
+                if not store.exists():
+                    continue
+                records = store.read()
+                usable = records["hand"] == 1
+                if self.mirror_augmentation:
+                    usable &= records["flipped"] == 0 # Varianta oglindita este generata la augmentare
+                with_hand = records[usable]
+                features.append(with_hand["features"])
+                labels.append(np.full(len(with_hand), class_index[dir_name], dtype=np.int32))
+                covered.update((dir_name, record_filename(r["mode"], r["number"], r["flipped"])) for r in records)
+        if features:
+            self.log_message.emit(f"Landmark-uri din captura: {sum(len(f) for f in features)} exemple, "
+                                  f"{len(covered)} imagini care nu mai trebuie procesate.")
+            return np.concatenate(features), np.concatenate(labels), covered
+        return np.empty((0, NUM_FEATURES), dtype=np.float32), np.empty(0, dtype=np.int32), covered
+
+    def _iter_serial(self, img_paths):
+        return iter_extract_serial(img_paths, self.hands)
+
+    def _iter_parallel(self, img_paths):
+        return iter_extract_parallel(img_paths, self.num_workers, self.chunk_size)
+
     def stop(self):
         self.running = False
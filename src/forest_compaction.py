@@ -0,0 +1,227 @@
+"""Compactarea modelului dupa antrenare: mai putini arbori si adancime limitata.
+
+Se cauta cea mai mica adancime si apoi cel mai mic numar de arbori (in ordinea lor din padure)
+pentru care padurea compactata da aceeasi predictie ca padurea completa pe cel putin
+1 - `tolerance` din setul de validare. Diferenta de acuratete pe orice set de date este cel
+mult proportia de predictii diferite, iar o proportie mica se estimeaza mult mai sigur decat
+acuratetea insasi. Arborii unei paduri aleatoare sunt interschimbabili, deci primii k arbori nu
+sunt alesi dupa setul de validare (o selectie greedy s-ar potrivi prea bine acestuia).
+
+Setul de validare nu trebuie folosit nici la antrenare, nici la raportare: acuratetea din
+raport se masoara pe un set de testare separat. ModelTrainingWorker alege adancimea si numarul
+de arbori pe o padure antrenata fara setul de validare, apoi le aplica (apply_compaction) padurii
+reantrenate pe tot setul de antrenare.
+
+Exemplu (foloseste aceeasi impartire 80/20 ca ModelTrainingWorker; setul de testare este
+impartit in jumatati pentru selectie si pentru raport):
+    python src/forest_compaction.py --tolerance 0.005
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+from compiled_forest import CompiledForest
+from model_artifact import MODEL_ARTIFACT_PATH, save_model_artifact, load_model_artifact
+
+DEFAULT_TOLERANCE = 0.005 # Proportia maxima de predictii diferite, deci si pierderea maxima de acuratete (0.5 puncte)
+MIN_DEPTH = 4
+MIN_TREES = 10
+VALIDATION_SIZE = 0.2 # Partea din setul de antrenare pastrata pentru selectie, cand se compacteaza
+LATENCY_SAMPLES = 200
+
+
+def median_row_latency_ms(predictor, X, samples=LATENCY_SAMPLES):
+    """Latenta mediana (ms) a unui predict_proba pe un singur rand, ca in inferenta live."""
+    times = []
+    for row in X[:samples]:
+        start = time.perf_counter()
+        predictor.predict_proba(row)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000.0 if times else 0.0
+
+
+def rebuild_forest(forest, tree_ids=None, max_depth=None):
+    """Padure noua doar cu arborii tree_ids, iar nodurile de la adancimea max_depth devin frunze.
+
+    Nodurile sunt parcurse nivel cu nivel; cele care nu mai sunt accesibile dispar. Nodurile
+    interne pastreaza deja distributia claselor (normalizata), deci pot deveni frunze direct.
+    """
+    roots = forest.roots if tree_ids is None else forest.roots[np.asarray(tree_ids)]
+    left, right = np.asarray(forest.children_left), np.asarray(forest.children_right)
+
+    levels = []
+    frontier = np.asarray(roots, dtype=np.int64)
+    depth = 0
+    while frontier.size:
+        levels.append(frontier)
+        if max_depth is not None and depth == max_depth:
+            break
+        internal = frontier[left[frontier] != frontier]
+        frontier = np.concatenate([left[internal], right[internal]])
+        depth += 1
+    old_ids = np.concatenate(levels)
+
+    mapping = np.full(forest.n_nodes, -1, dtype=np.int64)
+    mapping[old_ids] = np.arange(old_ids.size)
+    new_ids = np.arange(old_ids.size, dtype=np.int32)
+    new_left = mapping[left[old_ids]]
+    new_right = mapping[right[old_ids]]
+
+    # Nodurile de pe ultimul nivel pastrat isi pierd copiii si devin frunze
+    cut = new_left < 0
+    new_left = np.where(cut, new_ids, new_left).astype(np.int32)
+    new_right = np.where(cut, new_ids, new_right).astype(np.int32)
+    feature = np.where(cut, 0, np.asarray(forest.feature)[old_ids]).astype(np.int32)
+    threshold = np.where(cut, np.inf, np.asarray(forest.threshold)[old_ids])
+
+    return CompiledForest(feature, threshold, new_left, new_right,
+                          np.ascontiguousarray(np.asarray(forest.value)[old_ids]),
+                          mapping[roots].astype(np.int32), len(levels) - 1,
+                          forest.classes_, forest.n_features_in_, metadata=dict(forest.metadata))
+
+
+def forest_accuracy(forest, X, y):
+    return float(np.mean(forest.predict(X) == y))
+
+
+def smallest_depth(forest, X, reference, min_agreement):
+    """Cea mai mica adancime la care padurea (cu toti arborii) da predictiile `reference` pe min_agreement din X."""
+    for depth in range(MIN_DEPTH, forest.max_depth):
+        if forest_accuracy(rebuild_forest(forest, max_depth=depth), X, reference) >= min_agreement:
+            return depth
+    return forest.max_depth
+
+
+def smallest_tree_prefix(forest, X, reference, min_agreement, min_trees=MIN_TREES):
+    """Cel mai mic k >= min_trees pentru care primii k arbori dau predictiile `reference` pe min_agreement din X."""
+    class_index = {label: i for i, label in enumerate(forest.classes_.tolist())}
+    reference_idx = np.array([class_index[label] for label in np.asarray(reference).tolist()])
+
+    # Suma distributiilor primilor k arbori, pentru fiecare k: (n_arbori, n_randuri, n_clase)
+    per_tree = np.asarray(forest.value, dtype=np.float32)[forest.apply(X).T]
+    agreement = (np.cumsum(per_tree, axis=0).argmax(axis=2) == reference_idx).mean(axis=1)
+    for k in range(min(min_trees, forest.n_trees), forest.n_trees + 1):
+        if agreement[k - 1] >= min_agreement:
+            return k
+    return forest.n_trees
+
+
+def compact_forest(forest, X_val, tolerance=DEFAULT_TOLERANCE):
+    """Intoarce padurea compactata: predictiile difera de ale padurii complete pe cel mult tolerance din X_val.
+
+    X_val trebuie sa fie date nevazute la antrenare (nu sunt necesare etichetele); raportul se face pe alt set.
+    Adancimea primeste jumatate din toleranta, restul ramane pentru reducerea numarului de arbori.
+    """
+    reference = forest.predict(X_val)
+    depth = smallest_depth(forest, X_val, reference, 1.0 - tolerance / 2)
+    capped = rebuild_forest(forest, max_depth=depth) if depth < forest.max_depth else forest
+    n_trees = smallest_tree_prefix(capped, X_val, reference, 1.0 - tolerance)
+    compacted = rebuild_forest(capped, tree_ids=np.arange(n_trees))
+    compacted.metadata["compaction"] = {"tolerance": tolerance, "max_depth": compacted.max_depth,
+                                        "n_trees": compacted.n_trees, "source_trees": forest.n_trees}
+    return compacted
+
+
+def apply_compaction(forest, compaction):
+    """Aplica adancimea si numarul de arbori alese de compact_forest (metadata["compaction"]) altei paduri."""
+    max_depth = compaction["max_depth"] if compaction["max_depth"] < forest.max_depth else None
+    n_trees = min(compaction["n_trees"], forest.n_trees)
+    compacted = rebuild_forest(forest, tree_ids=np.arange(n_trees), max_depth=max_depth)
+    compacted.metadata["compaction"] = dict(compaction, max_depth=compacted.max_depth,
+                                            n_trees=compacted.n_trees, source_trees=forest.n_trees)
+    return compacted
+
+
+def _load_time_ms(forest, repeats=3):
+    """Timpul de incarcare (artefact memory-mapped) plus prima predictie."""
+    sample = np.zeros((1, forest.n_features_in_), dtype=np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = save_model_artifact(forest, os.path.join(tmp, MODEL_ARTIFACT_PATH))
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            load_model_artifact(path).predict_proba(sample)
+            times.append(time.perf_counter() - start)
+    return min(times) * 1000.0
+
+
+def _forest_size_mb(forest):
+    arrays = (forest.feature, forest.threshold, forest._children, forest.value, forest.roots)
+    return sum(np.asarray(a).nbytes for a in arrays) / 1e6
+
+
+def compaction_report(before, after, X_test, y_test):
+    """Dictionar {"inainte": {...}, "dupa": {...}} cu marime, incarcare, latenta si acuratete.
+
+    (X_test, y_test) nu trebuie sa fie setul folosit de compact_forest pentru selectie.
+    """
+    report = {}
+    for name, forest in (("inainte", before), ("dupa", after)):
+        report[name] = {
+            "trees": forest.n_trees,
+            "nodes": forest.n_nodes,
+            "max_depth": forest.max_depth,
+            "size_mb": round(_forest_size_mb(forest), 2),
+            "load_ms": round(_load_time_ms(forest), 2),
+            "latency_ms": round(median_row_latency_ms(forest, X_test), 3),
+            "accuracy": round(forest_accuracy(forest, X_test, y_test), 4),
+        }
+    return report
+
+
+def format_report(report):
+    rows = [("arbori", "trees"), ("noduri", "nodes"), ("adancime", "max_depth"), ("marime MB", "size_mb"),
+            ("incarcare ms", "load_ms"), ("latenta ms", "latency_ms"), ("acuratete", "accuracy")]
+    lines = [f"{'':<14}{'inainte':>12}{'dupa':>12}"]
+    for title, key in rows:
+        lines.append(f"{title:<14}{report['inainte'][key]:>12}{report['dupa'][key]:>12}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compacteaza modelul antrenat (arbori si adancime).")
+    parser.add_argument("--model", default="./model.joblib", help="modelul joblib sau un artefact")
+    parser.add_argument("--dataset", default="dataset", help="prefixul setului de date binar sau un .csv")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", default=MODEL_ARTIFACT_PATH, help="artefactul compactat (director sau .npz)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from sklearn.model_selection import train_test_split
+    from model_artifact import artifact_exists, training_metadata
+    from compiled_forest import compile_forest
+    from dataset_io import dataset_exists, load_dataset, load_dataset_csv, labels_from_indices
+
+    args = parse_args(argv)
+    if artifact_exists(args.model):
+        forest = load_model_artifact(args.model, mmap=False)
+    else:
+        import joblib
+        model = joblib.load(args.model)
+        forest = compile_forest(model)
+        forest.metadata = {"training": training_metadata(model)}
+
+    if dataset_exists(args.dataset):
+        X, labels, class_names = load_dataset(args.dataset, mmap=False)
+    else:
+        X, labels, class_names = load_dataset_csv(args.dataset)
+    y = labels_from_indices(labels, class_names)
+    # Aceeasi impartire ca in ModelTrainingWorker, deci acelasi set de testare. Modelul a vazut tot
+    # setul de antrenare, asa ca selectia si raportul folosesc jumatati diferite ale setului de testare.
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, shuffle=True, stratify=y)
+    X_val, X_report, _, y_report = train_test_split(X_test, y_test, test_size=0.5, random_state=42,
+                                                        shuffle=True, stratify=y_test)
+
+    compacted = compact_forest(forest, X_val, args.tolerance)
+    save_model_artifact(compacted, args.output, compacted.metadata.get("training"))
+    print(format_report(compaction_report(forest, compacted, X_report, y_report)))
+    print(f"Modelul compactat a fost salvat in '{args.output}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
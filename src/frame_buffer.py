@@ -0,0 +1,63 @@
+import threading
+import numpy as np
+
+
+class FrameRing:
+    """Inel de buffere prealocate pentru ultimul frame al camerei.
+
+    Producatorul (camera) scrie in slotul urmator fara alocari noi si il publica cu un
+    numar de secventa. Consumatorii cer doar frame-ul cel mai nou, fiecare in ritmul
+    lui; frame-urile necitite sunt suprascrise, nu se aduna nicaieri. Lock-ul protejeaza
+    doar indexul slotului; copierea se face in afara lui si este validata dupa (seqlock).
+    """
+
+    def __init__(self, slots=4):
+        self.slots = max(2, slots)
+        self._buffers = [None] * self.slots
+        self._slot_seqs = [0] * self.slots
+        self._latest_slot = -1
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Intoarce (slot, buffer) in care producatorul poate scrie urmatorul frame."""
+        with self._lock:
+            slot = (self._latest_slot + 1) % self.slots
+            self._slot_seqs[slot] = 0 # Cititorii care copiaza din acest slot vor reincerca
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = self._buffers[slot] = np.empty(shape, dtype=dtype)
+        return slot, buffer
+
+    def publish(self, slot):
+        with self._lock:
+            self._seq += 1
+            self._slot_seqs[slot] = self._seq
+            self._latest_slot = slot
+
+    def read_latest(self, last_seq=0, out=None):
+        """Copiaza cel mai nou frame daca este mai nou decat last_seq.
+
+        Intoarce (seq, frame) sau None. Daca `out` are forma potrivita, frame-ul este
+        copiat in el (fara alocare); altfel se aloca o copie noua.
+        """
+        while True:
+            with self._lock:
+                slot = self._latest_slot
+                seq = self._seq
+                if slot < 0 or seq <= last_seq:
+                    return None
+                source = self._buffers[slot]
+
+            if out is None or out.shape != source.shape or out.dtype != source.dtype:
+                out = np.empty_like(source)
+            np.copyto(out, source)
+
+            # Daca producatorul a refolosit slotul in timpul copierii, incercam din nou
+            with self._lock:
+                if self._slot_seqs[slot] == seq:
+                    return seq, out
@@ -0,0 +1,49 @@
+from itertools import chain
+import numpy as np
+
+# Formatul caracteristicilor folosit la creare set de date, antrenare si inferenta:
+# 21 de landmark-uri MediaPipe, fiecare cu (x, y, z) relativ la incheietura (landmark-ul 0)
+NUM_LANDMARKS = 21
+NUM_FEATURES = NUM_LANDMARKS * 3
+FEATURE_COLUMNS = [f"{coord}{i}" for i in range(NUM_LANDMARKS) for coord in ['x', 'y', 'z']]
+
+
+def landmarks_to_array(hand_landmarks):
+    """Copiaza landmark-urile unei maini intr-un array (21, 3) float32 dintr-o singura trecere."""
+    coords = chain.from_iterable((lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark)
+    return np.fromiter(coords, dtype=np.float32, count=NUM_FEATURES).reshape(NUM_LANDMARKS, 3)
+
+
+def normalize_scale(points):
+    """Imparte coordonatele relative la distanta maxima fata de incheietura (invariant la marime)."""
+    relative = points - points[..., :1, :]
+    scale = np.linalg.norm(relative, axis=-1).max(axis=-1, keepdims=True)[..., np.newaxis]
+    scale[scale == 0] = 1.0
+    return points[..., :1, :] + relative / scale
+
+
+def wrist_relative_features(points, scale_normalize=False):
+    """Transforma (..., 21, 3) in caracteristici (..., 63) relative la incheietura.
+
+    Ordinea este x0, y0, z0, x1, ... la fel ca FEATURE_COLUMNS.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    if scale_normalize:
+        points = normalize_scale(points)
+    relative = points - points[..., :1, :]
+    return relative.reshape(points.shape[:-2] + (NUM_FEATURES,))
+
+
+def landmarks_to_features(hand_landmarks, scale_normalize=False):
+    return wrist_relative_features(landmarks_to_array(hand_landmarks), scale_normalize)
+
+
+def bounding_box(points, width, height):
+    """Dreptunghiul (x1, y1, x2, y2) in pixeli; pentru un lot de maini intoarce un array (N, 4)."""
+    xy = np.asarray(points, dtype=np.float64)[..., :2]
+    mins = xy.min(axis=-2) * (width, height)
+    maxs = xy.max(axis=-2) * (width, height)
+    box = np.concatenate([mins, maxs], axis=-1).astype(int)
+    if box.ndim == 1:
+        return tuple(int(v) for v in box)
+    return box
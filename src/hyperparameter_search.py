@@ -0,0 +1,138 @@
+import os
+import time
+import random
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+
+from compiled_forest import compile_forest
+from forest_compaction import median_row_latency_ms
+
+# Spatiul cautat implicit; valorile actuale din ModelTrainingWorker sunt incluse
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [50, 100, 200],
+    "max_depth": [10, 15, 20, None],
+    "min_samples_split": [2, 5],
+}
+DEFAULT_CV_FOLDS = 5
+EARLY_STOP_MARGIN = 0.02 # Un candidat se opreste daca media pe fold-uri e cu 2 puncte sub cel mai bun
+ACCURACY_TOLERANCE = 0.01 # Fara prag explicit, acceptam modele cu cel mult 1 punct sub cel mai bun
+LATENCY_SAMPLES = 200
+
+# Datele de antrenare ale unui proces din pool (transmise o singura data, la pornire)
+_process_data = None
+
+
+def iter_candidates(param_grid=None, n_samples=None, random_state=42):
+    """Toate combinatiile din grila, sau n_samples alese aleator dintre ele."""
+    grid = param_grid or DEFAULT_PARAM_GRID
+    names = list(grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    if n_samples is not None and n_samples < len(candidates):
+        candidates = random.Random(random_state).sample(candidates, n_samples)
+    return candidates
+
+
+def format_params(params):
+    return ", ".join(f"{name}={value}" for name, value in params.items())
+
+
+def _init_search_process(X, y):
+    global _process_data
+    _process_data = (X, y)
+
+
+def measure_latency(model, X, samples=LATENCY_SAMPLES):
+    """Latenta per esantion (ms) pe backend-ul folosit la inferenta live: cate un rand pe apel.
+
+    Se foloseste mediana, ca procesele vecine din pool sa nu distorsioneze comparatia.
+    """
+    return median_row_latency_ms(compile_forest(model), X, samples)
+
+
+def evaluate_candidate(params, folds, best_accuracy=None, X=None, y=None):
+    """Validare incrucisata pentru un candidat, oprita devreme daca este clar mai slab decat best_accuracy."""
+    if X is None:
+        X, y = _process_data
+    scores = []
+    model = None
+    start = time.perf_counter()
+    for train_idx, test_idx in folds:
+        model = RandomForestClassifier(random_state=42, n_jobs=1, **params) # Paralelismul este intre candidati
+        model.fit(X[train_idx], y[train_idx])
+        scores.append(float(np.mean(model.predict(X[test_idx]) == y[test_idx])))
+        if (best_accuracy is not None and len(scores) < len(folds)
+                and np.mean(scores) + EARLY_STOP_MARGIN < best_accuracy):
+            return {"params": params, "accuracy": float(np.mean(scores)), "std": float(np.std(scores)),
+                    "folds": len(scores), "stopped_early": True, "latency_ms": None,
+                    "seconds": time.perf_counter() - start}
+
+    latency = measure_latency(model, X[folds[-1][1]])
+    return {"params": params, "accuracy": float(np.mean(scores)), "std": float(np.std(scores)),
+            "folds": len(scores), "stopped_early": False, "latency_ms": latency,
+            "seconds": time.perf_counter() - start}
+
+
+def stratified_folds(y, n_splits=DEFAULT_CV_FOLDS, random_state=42):
+    # Nu putem avea mai multe fold-uri decat exemple in cea mai mica clasa
+    _, counts = np.unique(y, return_counts=True)
+    n_splits = min(n_splits, int(counts.min()))
+    if n_splits < 2:
+        raise ValueError("Fiecare clasa trebuie sa aiba cel putin 2 exemple pentru validarea incrucisata.")
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def run_search(X, y, candidates, n_splits=DEFAULT_CV_FOLDS, num_workers=None, on_result=None, should_stop=None):
+    """Evalueaza candidatii in paralel (un candidat per proces) si intoarce rezultatele in ordinea terminarii.
+
+    Candidatii sunt trimisi pe rand, cate unul per proces liber, ca fiecare sa primeasca
+    cea mai buna acuratete cunoscuta pana atunci pentru oprirea devreme.
+    """
+    num_workers = num_workers or max(1, (os.cpu_count() or 1))
+    X = np.ascontiguousarray(X)
+    y = np.asarray(y)
+    folds = stratified_folds(y, n_splits)
+    pending_candidates = list(candidates)
+    results = []
+    best_accuracy = None
+
+    # spawn, nu fork: cautarea porneste din ModelTrainingWorker (QThread), iar un fork al unui proces cu thread-uri poate bloca
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_search_process, initargs=(X, y),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        running = set()
+        while pending_candidates or running:
+            while pending_candidates and len(running) < num_workers and not (should_stop and should_stop()):
+                running.add(executor.submit(evaluate_candidate, pending_candidates.pop(0), folds, best_accuracy))
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                if not result["stopped_early"] and (best_accuracy is None or result["accuracy"] > best_accuracy):
+                    best_accuracy = result["accuracy"]
+                if on_result is not None:
+                    on_result(result, len(results))
+    return results
+
+
+def select_candidate(results, min_accuracy=None):
+    """Cel mai rapid candidat care atinge pragul de acuratete.
+
+    Fara prag, pragul este cel mai bun rezultat minus ACCURACY_TOLERANCE. Daca niciun
+    candidat nu atinge pragul, se alege cel mai precis.
+    """
+    complete = [result for result in results if not result["stopped_early"]]
+    if not complete:
+        raise ValueError("Niciun candidat nu a terminat validarea incrucisata.")
+    best = max(complete, key=lambda result: result["accuracy"])
+    if min_accuracy is None:
+        min_accuracy = best["accuracy"] - ACCURACY_TOLERANCE
+    eligible = [result for result in complete if result["accuracy"] >= min_accuracy]
+    if not eligible:
+        return best
+    return min(eligible, key=lambda result: (result["latency_ms"], -result["accuracy"]))
@@ -0,0 +1,232 @@
+"""Containere shard pentru imaginile din ./data: un fisier per clasa si mod, in loc de mii de JPEG-uri.
+
+data/<clasa>/<prefix>.shard      octetii JPEG concatenati (append-only)
+data/<clasa>/<prefix>.shard.idx  indexul: numar imagine, flip, offset, lungime (scris dupa date)
+
+Conversie pentru directoarele existente:
+    python src/image_shards.py import --data ./data [--delete]
+    python src/image_shards.py export --data ./data --output ./data_jpg
+"""
+import os
+import re
+import sys
+import mmap
+import time
+import argparse
+import threading
+from collections import namedtuple, defaultdict
+from types import SimpleNamespace
+import numpy as np
+
+SHARD_SUFFIX = ".shard"
+INDEX_SUFFIX = ".shard.idx"
+INDEX_MAGIC = b"ASLSHD01"
+INDEX_HEADER_SIZE = 16 # magic + momentul crearii (int64, ns)
+
+INDEX_DTYPE = np.dtype([
+    ("number", "<i4"),
+    ("flipped", "u1"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+])
+
+# Numele imaginilor salvate de capture_window: <prefix>_<numar>[_flipped].jpg
+IMAGE_NAME_RE = re.compile(r"^(?P<prefix>.+)_(?P<number>\d+)(?P<flipped>_flipped)?\.jpg$")
+
+# O imagine dintr-un shard, folosita ca sursa la crearea setului de date; generation este citit o data per shard
+ShardImageRef = namedtuple("ShardImageRef", ["shard", "entry", "generation"])
+
+
+def image_filename(prefix, number, flipped):
+    return f"{prefix}_{int(number)}{'_flipped' if flipped else ''}.jpg"
+
+
+class ImageShard:
+    """Shard-ul append-only al unui mod dintr-o clasa; citirea foloseste mmap."""
+
+    def __init__(self, class_dir, prefix):
+        self.class_dir = class_dir
+        self.prefix = prefix
+        self.data_path = os.path.join(class_dir, prefix + SHARD_SUFFIX)
+        self.index_path = os.path.join(class_dir, prefix + INDEX_SUFFIX)
+        self._lock = threading.Lock()
+        self._map = None
+        self._map_size = 0
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def append(self, number, flipped, jpeg_bytes):
+        """Adauga o imagine; indexul este scris dupa date, deci o intrare indexata este mereu completa."""
+        with self._lock:
+            if not os.path.exists(self.index_path):
+                with open(self.index_path, 'wb') as fh:
+                    header = INDEX_MAGIC + np.int64(time.time_ns()).tobytes()
+                    fh.write(header.ljust(INDEX_HEADER_SIZE, b"\0"))
+            with open(self.data_path, 'ab') as fh:
+                offset = fh.tell()
+                fh.write(jpeg_bytes)
+            entry = np.array([(number, int(flipped), offset, len(jpeg_bytes))], dtype=INDEX_DTYPE)
+            with open(self.index_path, 'ab') as fh:
+                partial = (fh.tell() - INDEX_HEADER_SIZE) % INDEX_DTYPE.itemsize
+                if partial:
+                    fh.truncate(fh.tell() - partial)
+                fh.write(entry.tobytes())
+
+    def generation(self):
+        """Momentul crearii shard-ului; se schimba daca modul este resetat si shard-ul recreat."""
+        with open(self.index_path, 'rb') as fh:
+            header = fh.read(INDEX_HEADER_SIZE)
+        if header[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"'{self.index_path}' nu este un index de shard.")
+        return int(np.frombuffer(header, dtype=np.int64, count=1, offset=len(INDEX_MAGIC))[0])
+
+    def entries(self):
+        """Intrarile complete din index (cele care indica in afara datelor sunt ignorate)."""
+        with self._lock:
+            if not os.path.exists(self.index_path):
+                return np.empty(0, dtype=INDEX_DTYPE)
+            self.generation() # Valideaza antetul
+            count = (os.path.getsize(self.index_path) - INDEX_HEADER_SIZE) // INDEX_DTYPE.itemsize
+            entries = np.fromfile(self.index_path, dtype=INDEX_DTYPE, count=count, offset=INDEX_HEADER_SIZE)
+            data_size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        return entries[entries["offset"] + entries["length"] <= data_size]
+
+    def _mapped(self, end):
+        # Remapam doar cand shard-ul a crescut peste zona deja mapata
+        if self._map is None or end > self._map_size:
+            self.close()
+            with open(self.data_path, 'rb') as fh:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_size = len(self._map)
+        return self._map
+
+    def read_bytes(self, entry):
+        offset, length = int(entry["offset"]), int(entry["length"])
+        return self._mapped(offset + length)[offset:offset + length]
+
+    def iter_images(self):
+        """(nume fisier, octeti JPEG) in ordinea adaugarii; citire secventiala din mmap."""
+        for entry in self.entries():
+            yield image_filename(self.prefix, entry["number"], entry["flipped"]), self.read_bytes(entry)
+
+    def numbers(self):
+        entries = self.entries()
+        return set(entries["number"][entries["flipped"] == 0].tolist())
+
+    def entry_stat(self, entry, generation):
+        """Echivalentul os.stat pentru o imagine din shard (cheia LandmarkCache).
+
+        generation (rezultatul generation()) se citeste o singura data pentru tot shard-ul.
+        """
+        return SimpleNamespace(st_mtime_ns=generation, st_size=int(entry["length"]))
+
+    def remove(self):
+        """Sterge shard-ul (la resetarea modului); intoarce numarul de imagini sterse."""
+        count = len(self.entries())
+        with self._lock:
+            self.close()
+            for path in (self.index_path, self.data_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return count
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._map_size = 0
+
+
+_shards = {}
+_shards_lock = threading.Lock()
+
+def get_image_shard(class_dir, prefix):
+    """O singura instanta (si un singur lock) per shard, partajata de thread-urile writer-ului."""
+    key = (os.path.normpath(class_dir), prefix)
+    with _shards_lock:
+        shard = _shards.get(key)
+        if shard is None:
+            shard = _shards[key] = ImageShard(class_dir, prefix)
+        return shard
+
+
+def list_shards(class_dir):
+    prefixes = sorted(name[:-len(INDEX_SUFFIX)] for name in os.listdir(class_dir) if name.endswith(INDEX_SUFFIX))
+    return [get_image_shard(class_dir, prefix) for prefix in prefixes]
+
+
+def load_image_source(source):
+    """Calea fisierului ramane cale; o imagine din shard devine octetii ei JPEG."""
+    if isinstance(source, ShardImageRef):
+        return bytes(source.shard.read_bytes(source.entry))
+    return source
+
+
+def import_class_dir(class_dir, delete=False):
+    """Muta JPEG-urile unei clase in shard-uri (cate unul per mod); intoarce numarul de imagini importate."""
+    groups = defaultdict(list)
+    for filename in os.listdir(class_dir):
+        match = IMAGE_NAME_RE.match(filename)
+        if match:
+            groups[match["prefix"]].append((int(match["number"]), bool(match["flipped"]), filename))
+
+    imported = 0
+    for prefix, images in groups.items():
+        shard = get_image_shard(class_dir, prefix)
+        existing = {(int(e["number"]), bool(e["flipped"])) for e in shard.entries()}
+        for number, flipped, filename in sorted(images):
+            path = os.path.join(class_dir, filename)
+            if (number, flipped) not in existing:
+                with open(path, 'rb') as fh:
+                    shard.append(number, flipped, fh.read())
+                imported += 1
+            if delete:
+                os.remove(path)
+    return imported
+
+
+def export_class_dir(class_dir, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    exported = 0
+    for shard in list_shards(class_dir):
+        for filename, data in shard.iter_images():
+            with open(os.path.join(output_dir, filename), 'wb') as fh:
+                fh.write(data)
+            exported += 1
+    return exported
+
+
+def _class_dirs(data_dir):
+    return sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Conversie intre directoarele cu JPEG-uri si shard-uri.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="JPEG-uri -> shard-uri")
+    importer.add_argument("--data", default="./data")
+    importer.add_argument("--delete", action="store_true", help="sterge JPEG-urile dupa import")
+    exporter = commands.add_parser("export", help="shard-uri -> JPEG-uri")
+    exporter.add_argument("--data", default="./data")
+    exporter.add_argument("--output", required=True)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    total = 0
+    for dir_name in _class_dirs(args.data):
+        class_dir = os.path.join(args.data, dir_name)
+        if args.command == "import":
+            count = import_class_dir(class_dir, args.delete)
+        else:
+            count = export_class_dir(class_dir, os.path.join(args.output, dir_name))
+        total += count
+        print(f"Clasa {dir_name}: {count} imagini")
+    print(f"Total: {total} imagini ({args.command}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
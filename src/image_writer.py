@@ -0,0 +1,113 @@
+import os
+import queue
+import threading
+import cv2
+
+from image_shards import get_image_shard
+
+
+def _write_jpeg(path, image):
+    # cv2.imwrite nu arunca exceptii: un disc plin sau o cale gresita intorc doar False
+    if not cv2.imwrite(path, image):
+        raise IOError(f"Scrierea imaginii '{path}' a esuat")
+
+
+class AsyncImageWriter:
+    """Salveaza imaginile (original + flip) pe thread-uri separate de capturare.
+
+    Frame-urile intra intr-o coada marginita; daca encoderele nu tin pasul, submit
+    intoarce False si frame-ul este numarat ca aruncat, in loc sa blocheze captura.
+    Cu use_shards, JPEG-urile sunt adaugate in shard-ul modului (image_shards), nu in fisiere separate.
+    """
+
+    def __init__(self, num_threads=2, max_queue=64, save_flipped=True, use_shards=False):
+        self.save_flipped = save_flipped
+        self.use_shards = use_shards
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_error = None
+        self._threads = []
+        for _ in range(max(1, num_threads)):
+            thread = threading.Thread(target=self._writer_loop, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    @property
+    def capacity(self):
+        return self._queue.maxsize
+
+    def submit(self, frame, class_dir, filename_base):
+        """Pune frame-ul in coada de scriere. Frame-ul nu trebuie modificat dupa apel."""
+        try:
+            self._queue.put_nowait((frame, class_dir, filename_base))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.queued += 1
+        return True
+
+    def _writer_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                frame, class_dir, filename_base = item
+                if self.use_shards:
+                    self._append_to_shard(frame, class_dir, filename_base)
+                else:
+                    _write_jpeg(os.path.join(class_dir, f"{filename_base}.jpg"), frame)
+                    if self.save_flipped:
+                        _write_jpeg(os.path.join(class_dir, f"{filename_base}_flipped.jpg"), cv2.flip(frame, 1))
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                    self.last_error = str(e)
+            finally:
+                self._queue.task_done()
+
+    def _append_to_shard(self, frame, class_dir, filename_base):
+        prefix, number = filename_base.rsplit('_', 1) # '<prefix>_<numar>', ca numele fisierelor
+        shard = get_image_shard(class_dir, prefix)
+        variants = [(False, frame)]
+        if self.save_flipped:
+            variants.append((True, cv2.flip(frame, 1)))
+        for flipped, image in variants:
+            ok, encoded = cv2.imencode('.jpg', image)
+            if not ok:
+                raise IOError(f"Codarea JPEG a esuat pentru {filename_base}")
+            shard.append(int(number), flipped, encoded.tobytes())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pending": self._queue.qsize(),
+            }
+
+    def flush(self):
+        """Asteapta pana cand toate frame-urile din coada sunt scrise pe disc."""
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
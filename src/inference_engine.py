@@ -0,0 +1,118 @@
+import os
+import warnings
+from collections import namedtuple
+import joblib
+import numpy as np
+
+from compiled_forest import compile_forest
+from model_artifact import (
+    MODEL_ARTIFACT_PATH, artifact_exists, artifact_mtime, load_model_artifact, save_model_artifact, training_metadata
+)
+
+MODEL_PATH = "./model.joblib"
+
+# Eticheta de clasa (directorul din ./data) -> litera ASL
+ASL_LETTERS = {
+    0: 'A', 1: 'B', 2: 'C', 3: 'D', 4: 'E', 5: 'F', 6: 'G', 7: 'H', 8: 'I', 9: 'K',
+    10: 'L', 11: 'M', 12: 'N', 13: 'O', 14: 'P', 15: 'Q', 16: 'R', 17: 'S', 18: 'T',
+    19: 'U', 20: 'V', 21: 'W', 22: 'X', 23: 'Y'
+}
+
+# "compiled" parcurge padurea aplatizata (compiled_forest), "sklearn" apeleaza modelul original
+INFERENCE_BACKENDS = ("compiled", "sklearn")
+
+# Rezultatul unei predictii: eticheta (din model.classes_), confidenta ei,
+# primele top_k perechi (eticheta, probabilitate) si vectorul complet de probabilitati
+Prediction = namedtuple("Prediction", ["label", "confidence", "top_k", "probabilities"])
+
+
+def letter_for_label(label):
+    """Litera ASL pentru o eticheta a modelului (sau eticheta ca text daca nu e in ASL_LETTERS)."""
+    if isinstance(label, np.generic):
+        label = label.item()
+    return ASL_LETTERS.get(label, str(label)) if isinstance(label, int) else str(label)
+
+
+def load_inference_model(backend="compiled", model_path=MODEL_PATH, compiled_path=MODEL_ARTIFACT_PATH, mmap_mode=None):
+    """Incarca modelul pentru backend-ul ales.
+
+    Pentru "compiled" se foloseste direct artefactul (model_artifact, memory-mapped sau .npz)
+    daca nu este mai vechi decat model.joblib, fara sa importe sklearn; altfel modelul este
+    compilat si artefactul rescris. Un artefact compactat (forest_compaction) nu este rescris:
+    modelul nou este compilat doar in memorie, cu un avertisment. mmap_mode (ex. 'r') este
+    transmis lui joblib.load.
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Backend de inferenta necunoscut: {backend}")
+
+    if backend == "compiled":
+        if artifact_exists(compiled_path):
+            if not os.path.exists(model_path) or artifact_mtime(compiled_path) >= os.path.getmtime(model_path):
+                return load_model_artifact(compiled_path)
+            if "compaction" in load_model_artifact(compiled_path).metadata:
+                warnings.warn(f"'{model_path}' este mai nou decat artefactul compactat '{compiled_path}'; "
+                              "se foloseste modelul necompactat, iar artefactul nu este rescris. "
+                              "Rulati din nou compactarea (forest_compaction.py).")
+                return compile_forest(joblib.load(model_path, mmap_mode=mmap_mode))
+        model = joblib.load(model_path, mmap_mode=mmap_mode)
+        forest = compile_forest(model)
+        save_model_artifact(forest, compiled_path, training_metadata(model))
+        return forest
+
+    return joblib.load(model_path, mmap_mode=mmap_mode)
+
+
+def _supports_fast_path(model):
+    # RandomForestClassifier cu o singura iesire: arborii pot fi apelati direct cu check_input=False
+    estimators = getattr(model, "estimators_", None)
+    if not estimators or getattr(model, "n_outputs_", 1) != 1:
+        return False
+    return all(hasattr(e, "predict_proba") and hasattr(e, "tree_") for e in estimators)
+
+
+class InferenceEngine:
+    """O singura trecere predict_proba per apel; eticheta este argmax-ul mapat prin classes_."""
+
+    def __init__(self, model, fast_path=True, top_k=3):
+        self.model = model
+        self.classes_ = np.asarray(model.classes_)
+        self.n_features_in_ = int(model.n_features_in_)
+        self.top_k = max(1, min(int(top_k), len(self.classes_)))
+        self.fast_path = fast_path and _supports_fast_path(model)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Se asteapta {self.n_features_in_} caracteristici, dar s-au gasit {X.shape[1]}")
+
+        if not self.fast_path:
+            return self.model.predict_proba(X)
+
+        # Acelasi calcul ca RandomForestClassifier.predict_proba, fara validarea intrarii
+        # si fara pornirea joblib.Parallel la fiecare apel (costisitoare pentru un singur rand)
+        X = np.ascontiguousarray(X)
+        proba = np.zeros((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for estimator in self.model.estimators_:
+            proba += estimator.predict_proba(X, check_input=False)
+        proba /= len(self.model.estimators_)
+        return proba
+
+    def prediction_from_proba(self, proba_row):
+        """Construieste Prediction dintr-un vector de probabilitati (ex. unul netezit)."""
+        best = int(np.argmax(proba_row))
+        if self.top_k > 1:
+            order = np.argsort(-proba_row, kind='stable')[:self.top_k] # La egalitate, ca argmax
+        else:
+            order = [best]
+        top_k = [(self.classes_[i], float(proba_row[i])) for i in order]
+        return Prediction(self.classes_[best], float(proba_row[best]), top_k, proba_row)
+
+    def predict(self, features):
+        """Predictie pentru un singur vector de caracteristici."""
+        return self.prediction_from_proba(self.predict_proba(features)[0])
+
+    def predict_batch(self, X):
+        """Predictii pentru mai multi vectori, cu un singur predict_proba."""
+        return [self.prediction_from_proba(row) for row in self.predict_proba(X)]
@@ -0,0 +1,69 @@
+import numpy as np
+
+from hand_features import NUM_LANDMARKS, NUM_FEATURES
+
+# Raportul latime / inaltime al camerei; coordonatele MediaPipe sunt normalizate separat pe fiecare axa
+CAMERA_ASPECT = 640 / 480
+
+
+def _as_points(features):
+    return np.asarray(features, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+
+
+def mirror_features(features):
+    """Echivalentul cv2.flip(frame, 1): x devine 1 - x, deci x-ul relativ la incheietura isi schimba semnul."""
+    points = _as_points(features).copy()
+    points[..., 0] = -points[..., 0]
+    return points.reshape(-1, NUM_FEATURES)
+
+
+def rotate_features(features, angles_deg, aspect=CAMERA_ASPECT):
+    """Roteste fiecare mana in planul imaginii in jurul incheieturii (unghiuri in grade, unul per rand).
+
+    Rotatia se face in pixeli (x scalat cu aspect), altfel o mana ar fi si deformata.
+    """
+    points = _as_points(features).copy()
+    angles = np.deg2rad(np.asarray(angles_deg, dtype=np.float32)).reshape(-1, 1)
+    cos, sin = np.cos(angles), np.sin(angles)
+    x = points[..., 0] * aspect
+    y = points[..., 1]
+    points[..., 0] = (x * cos - y * sin) / aspect
+    points[..., 1] = x * sin + y * cos
+    return points.reshape(-1, NUM_FEATURES)
+
+
+def scale_features(features, factors):
+    """Mana mai aproape / mai departe de camera: toate coordonatele relative sunt scalate (un factor per rand)."""
+    factors = np.asarray(factors, dtype=np.float32).reshape(-1, 1)
+    return np.asarray(features, dtype=np.float32) * factors
+
+
+def augment_dataset(features, labels, mirror=True, rotation_deg=0.0, scale_jitter=0.0, copies=1, random_state=42):
+    """Adauga exemple obtinute in spatiul landmark-urilor; exemplele originale raman primele.
+
+    mirror adauga varianta oglindita a fiecarui exemplu (inlocuieste imaginile _flipped.jpg).
+    Daca rotation_deg sau scale_jitter sunt nenule, se mai adauga `copies` variante aleatoare
+    (unghi in [-rotation_deg, rotation_deg], factor in [1 - scale_jitter, 1 + scale_jitter])
+    ale tuturor exemplelor, inclusiv ale celor oglindite.
+    """
+    features = np.asarray(features, dtype=np.float32)
+    labels = np.asarray(labels)
+    all_features, all_labels = [features], [labels]
+    if mirror:
+        all_features.append(mirror_features(features))
+        all_labels.append(labels)
+
+    if rotation_deg > 0 or scale_jitter > 0:
+        rng = np.random.default_rng(random_state)
+        base_features = np.concatenate(all_features)
+        base_labels = np.concatenate(all_labels)
+        for _ in range(copies):
+            jittered = base_features
+            if rotation_deg > 0:
+                jittered = rotate_features(jittered, rng.uniform(-rotation_deg, rotation_deg, len(jittered)))
+            if scale_jitter > 0:
+                jittered = scale_features(jittered, rng.uniform(1 - scale_jitter, 1 + scale_jitter, len(jittered)))
+            all_features.append(jittered)
+            all_labels.append(base_labels)
+
+    return np.concatenate(all_features), np.concatenate(all_labels)
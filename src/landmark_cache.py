@@ -0,0 +1,107 @@
+import os
+import numpy as np
+
+from hand_features import NUM_FEATURES
+
+CACHE_FILENAME = ".landmark_cache.npz"
+CACHE_PATH = os.path.join("./data", CACHE_FILENAME) # Fisierul cache-ului, langa directoarele claselor
+
+class LandmarkCache:
+    """Cache persistent cu landmark-urile extrase pentru fiecare imagine.
+
+    O intrare este valida cat timp fisierul are aceeasi dimensiune si acelasi mtime.
+    Pentru imaginile fara mana detectata se retine doar marcajul (features = None).
+    """
+
+    def __init__(self, cache_path=CACHE_PATH):
+        self.cache_path = cache_path
+        self.entries = {} # cale -> (mtime_ns, size, data_aux sau None)
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    @staticmethod
+    def _key(path):
+        return os.path.normpath(path)
+
+    def load(self):
+        self.entries = {}
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as f:
+                paths = f['paths']
+                mtimes = f['mtimes']
+                sizes = f['sizes']
+                detected = f['detected']
+                features = f['features']
+        except Exception:
+            # Cache corupt sau dintr-o versiune veche: il reconstruim de la zero
+            self.dirty = True
+            return
+
+        for i, path in enumerate(paths.tolist()):
+            data_aux = features[i] if detected[i] else None
+            self.entries[path] = (int(mtimes[i]), int(sizes[i]), data_aux)
+
+    def save(self):
+        count = len(self.entries)
+        paths = np.array(list(self.entries.keys()), dtype=str)
+        mtimes = np.empty(count, dtype=np.int64)
+        sizes = np.empty(count, dtype=np.int64)
+        detected = np.zeros(count, dtype=bool)
+        features = np.zeros((count, NUM_FEATURES), dtype=np.float32)
+
+        for i, (mtime_ns, size, data_aux) in enumerate(self.entries.values()):
+            mtimes[i] = mtime_ns
+            sizes[i] = size
+            if data_aux is not None:
+                detected[i] = True
+                features[i] = data_aux
+
+        # Scriem intr-un fisier temporar si il inlocuim atomic pe cel vechi
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'wb') as fh:
+            np.savez(fh, paths=paths, mtimes=mtimes, sizes=sizes, detected=detected, features=features)
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+    def lookup(self, path, stat):
+        """Intoarce (True, data_aux) daca imaginea e in cache si nu s-a modificat, altfel (False, None)."""
+        entry = self.entries.get(self._key(path))
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self.hits += 1
+            return True, entry[2]
+        self.misses += 1
+        return False, None
+
+    def store(self, path, stat, data_aux):
+        self.entries[self._key(path)] = (stat.st_mtime_ns, stat.st_size, data_aux)
+        self.dirty = True
+
+    def discard(self, paths):
+        removed = 0
+        for path in paths:
+            if self.entries.pop(self._key(path), None) is not None:
+                removed += 1
+        if removed:
+            self.dirty = True
+        return removed
+
+    def retain(self, paths):
+        """Pastreaza doar intrarile pentru fisierele date (elimina imaginile sterse)."""
+        keep = {self._key(path) for path in paths}
+        stale = [key for key in self.entries if key not in keep]
+        return self.discard(stale)
+
+
+def discard_cached_landmarks(paths, cache_path=CACHE_PATH):
+    """Elimina din cache-ul de pe disc intrarile pentru imaginile sterse."""
+    if not paths or not os.path.exists(cache_path):
+        return 0
+    cache = LandmarkCache(cache_path)
+    cache.load()
+    removed = cache.discard(paths)
+    if cache.dirty:
+        cache.save()
+    return removed
@@ -0,0 +1,93 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import mediapipe as mp
+import numpy as np
+import cv2
+
+from hand_features import landmarks_to_features
+
+# Rezultatele posibile ale extragerii pentru o imagine
+EXTRACT_OK = "ok"
+EXTRACT_NO_HAND = "no_hand"
+EXTRACT_READ_ERROR = "read_error"
+
+# Detectorul de maini al unui proces din pool (creat o singura data per proces)
+_process_hands = None
+
+
+def create_hands_detector():
+    return mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.3)
+
+
+def extract_landmarks(hands, image):
+    """Ruleaza MediaPipe pe o imagine si intoarce (status, data_aux).
+
+    `image` este calea unui fisier, octetii unui JPEG (ex. dintr-un shard) sau un frame BGR
+    deja decodat (ex. dintr-un video).
+    """
+    if isinstance(image, str):
+        img = cv2.imread(image)
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        img = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    else:
+        img = image
+    if img is None:
+        return EXTRACT_READ_ERROR, None
+
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    results = hands.process(img_rgb)
+
+    if not results.multi_hand_landmarks:
+        return EXTRACT_NO_HAND, None
+
+    return EXTRACT_OK, landmarks_to_features(results.multi_hand_landmarks[0])
+
+
+def _init_extraction_process():
+    global _process_hands
+    _process_hands = create_hands_detector()
+
+
+def _extract_chunk(images):
+    # Ruleaza in procesele din pool, fiecare cu propriul detector
+    return [extract_landmarks(_process_hands, image) for image in images]
+
+
+def iter_extract_serial(images, hands=None):
+    if hands is None:
+        hands = create_hands_detector()
+    for image in images:
+        yield extract_landmarks(hands, image)
+
+
+def iter_extract_parallel(images, num_workers, chunk_size=32):
+    """Distribuie imaginile pe procese in bucati si intoarce rezultatele in ordinea initiala.
+
+    `images` poate fi orice iterabil (inclusiv un generator de frame-uri); se citesc doar
+    bucatile trimise deja, iar inchiderea generatorului anuleaza bucatile ramase.
+    """
+    images = iter(images)
+    max_in_flight = num_workers * 2 # Limitam bucatile trimise ca oprirea sa fie rapida
+
+    # spawn: apelul vine dintr-un QThread, intr-un proces cu thread-uri Qt / MediaPipe / OpenCV,
+    # iar un fork al unui astfel de proces poate bloca procesele copil
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_extraction_process,
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        pending = deque()
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_in_flight:
+                    chunk = list(islice(images, chunk_size))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    pending.append(executor.submit(_extract_chunk, chunk))
+                if pending:
+                    for result in pending.popleft().result():
+                        yield result
+        finally:
+            for future in pending:
+                future.cancel()
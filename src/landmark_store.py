@@ -0,0 +1,194 @@
+import os
+import queue
+import threading
+import numpy as np
+import cv2
+
+from hand_features import NUM_FEATURES
+
+STORE_FILENAME = "landmarks.lmk"
+STORE_MAGIC = b"ASLLMK01"
+HEADER_SIZE = 16
+
+# Un rand per imagine (originala sau flip): modul, numarul imaginii, daca s-a detectat mana si vectorul
+RECORD_DTYPE = np.dtype([
+    ("mode", "S16"),
+    ("number", "<i4"),
+    ("flipped", "u1"),
+    ("hand", "u1"),
+    ("features", "<f4", (NUM_FEATURES,)),
+])
+
+
+def record_filename(mode, number, flipped):
+    """Numele imaginii JPEG corespunzatoare unui rand (aceeasi conventie ca in capture_window)."""
+    if isinstance(mode, bytes):
+        mode = mode.decode("ascii")
+    return f"{mode}_{int(number)}{'_flipped' if flipped else ''}.jpg"
+
+
+class LandmarkStore:
+    """Fisier append-only cu landmark-urile unei clase, scris in timpul capturii.
+
+    Fiecare rand are dimensiune fixa (RECORD_DTYPE), deci fisierul se citeste direct cu
+    NumPy; un rand scris pe jumatate (ex. la o oprire brusca) este ignorat la citire.
+    """
+
+    def __init__(self, class_dir):
+        self.path = os.path.join(class_dir, STORE_FILENAME)
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def append(self, records):
+        data = np.asarray(records, dtype=RECORD_DTYPE).tobytes()
+        with self._lock:
+            new_file = not os.path.exists(self.path)
+            with open(self.path, 'ab') as fh:
+                if new_file:
+                    fh.write(STORE_MAGIC.ljust(HEADER_SIZE, b"\0"))
+                else:
+                    # Un rand incomplet lasat de o oprire brusca ar decala toate randurile noi
+                    partial = (fh.tell() - HEADER_SIZE) % RECORD_DTYPE.itemsize
+                    if partial:
+                        fh.truncate(fh.tell() - partial)
+                fh.write(data)
+
+    def read(self):
+        with self._lock:
+            if not os.path.exists(self.path):
+                return np.empty(0, dtype=RECORD_DTYPE)
+            with open(self.path, 'rb') as fh:
+                if fh.read(HEADER_SIZE)[:len(STORE_MAGIC)] != STORE_MAGIC:
+                    raise ValueError(f"'{self.path}' nu este un fisier de landmark-uri.")
+                count = (os.path.getsize(self.path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+                return np.fromfile(fh, dtype=RECORD_DTYPE, count=count)
+
+    def remove_mode(self, mode_prefix):
+        """Sterge randurile unui mod (la resetarea lui); intoarce cate randuri au fost sterse."""
+        records = self.read()
+        keep = records[records["mode"] != mode_prefix.encode("ascii")]
+        removed = len(records) - len(keep)
+        if removed:
+            with self._lock:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'wb') as fh:
+                    fh.write(STORE_MAGIC.ljust(HEADER_SIZE, b"\0"))
+                    fh.write(keep.tobytes())
+                os.replace(tmp_path, self.path)
+        return removed
+
+    def numbers(self, mode_prefix):
+        """Numerele imaginilor originale din acest mod (pentru indexul capturii)."""
+        records = self.read()
+        mask = (records["mode"] == mode_prefix.encode("ascii")) & (records["flipped"] == 0)
+        return set(records["number"][mask].tolist())
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_landmark_store(class_dir):
+    """O singura instanta (si un singur lock) per director de clasa."""
+    key = os.path.normpath(class_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = LandmarkStore(class_dir)
+        return store
+
+
+class CaptureLandmarkExtractor:
+    """Ruleaza detectia mainii pe frame-urile capturate, pe un thread separat de captura.
+
+    Rezultatul (inclusiv 'fara mana') este adaugat in LandmarkStore-ul clasei, pentru frame
+    si pentru varianta lui oglindita, exact ca perechea de imagini JPEG. Coada este marginita;
+    capturarea verifica has_room inainte sa accepte un frame nou.
+    """
+
+    def __init__(self, max_queue=32, extract_flipped=True):
+        self.extract_flipped = extract_flipped
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.extracted = 0
+        self.no_hand = 0
+        self.failed = 0
+        self.last_error = None
+        self._thread = threading.Thread(target=self._extract_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    @property
+    def capacity(self):
+        return self._queue.maxsize
+
+    def has_room(self):
+        return self._queue.qsize() < self._queue.maxsize
+
+    def submit(self, frame, class_dir, mode_prefix, number):
+        """Pune frame-ul in coada. Frame-ul nu trebuie modificat dupa apel."""
+        try:
+            self._queue.put_nowait((frame, class_dir, mode_prefix, number))
+        except queue.Full:
+            return False
+        with self._lock:
+            self.queued += 1
+        return True
+
+    def _record(self, hands, image, mode_prefix, number, flipped):
+        from landmark_extraction import EXTRACT_OK, extract_landmarks
+        status, data_aux = extract_landmarks(hands, image)
+        hand = status == EXTRACT_OK
+        with self._lock:
+            if hand:
+                self.extracted += 1
+            else:
+                self.no_hand += 1
+        features = data_aux if hand else np.zeros(NUM_FEATURES, dtype=np.float32)
+        return (mode_prefix.encode("ascii"), number, int(flipped), int(hand), features)
+
+    def _extract_loop(self):
+        from landmark_extraction import create_hands_detector
+        hands = None # Detectorul este creat in acest thread, la primul frame
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if hands is None:
+                    hands = create_hands_detector()
+                frame, class_dir, mode_prefix, number = item
+                records = [self._record(hands, frame, mode_prefix, number, False)]
+                if self.extract_flipped:
+                    records.append(self._record(hands, cv2.flip(frame, 1), mode_prefix, number, True))
+                get_landmark_store(class_dir).append(records)
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                    self.last_error = str(e)
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "extracted": self.extracted,
+                "no_hand": self.no_hand,
+                "failed": self.failed,
+                "pending": self._queue.qsize(),
+            }
+
+    def flush(self):
+        """Asteapta pana cand toate frame-urile din coada au fost procesate si salvate."""
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
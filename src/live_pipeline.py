@@ -0,0 +1,241 @@
+import time
+import queue
+import threading
+from collections import deque
+import numpy as np
+import cv2
+
+
+class StageTimings:
+    """Duratele pe ultimele `window` masuratori, pentru fiecare etapa a pipeline-ului (p50 / p95 / max).
+
+    Cu enabled=False, record iese imediat: masuratorile pot ramane in bucla live fara cost vizibil.
+    """
+
+    def __init__(self, window=120, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentiles_ms(self):
+        """{etapa: {"p50", "p95", "max", "n"}} in ms; calculat doar la cerere (ex. o data pe secunda)."""
+        with self._lock:
+            samples = {stage: np.array(s) for stage, s in self._samples.items() if s}
+        stats = {}
+        for stage, values in samples.items():
+            values = values * 1000.0
+            p50, p95 = np.percentile(values, (50, 95))
+            stats[stage] = {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                            "max": round(float(values.max()), 3), "n": int(values.size)}
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+def format_stage_stats(stages):
+    return ", ".join(f"{stage} {s['p50']:.1f}/{s['p95']:.1f}/{s['max']:.1f} ms" for stage, s in stages.items())
+
+
+def pipeline_metrics(timings, frames_in, frames_processed, frames_dropped, fps=0.0, detections_per_second=0.0):
+    """Instantaneul metricilor live, serializabil ca JSON (semnal, HUD, fisier)."""
+    return {
+        "timestamp": round(time.time(), 3),
+        "fps": round(float(fps), 2),
+        "detections_per_second": round(float(detections_per_second), 2),
+        "frames": {"in": int(frames_in), "processed": int(frames_processed), "dropped": int(frames_dropped)},
+        "stages": timings.percentiles_ms() if timings.enabled else {},
+    }
+
+
+def metrics_hud_lines(metrics):
+    frames = metrics["frames"]
+    lines = [f"FPS {metrics['fps']:.1f}  in {frames['in']}  proc {frames['processed']}  drop {frames['dropped']}"]
+    stages = metrics["stages"]
+    width = max((len(stage) for stage in stages), default=0)
+    lines.extend(f"{stage:<{width}} p50 {s['p50']:6.1f}  p95 {s['p95']:6.1f}  max {s['max']:6.1f} ms"
+                 for stage, s in stages.items())
+    return lines
+
+
+def draw_metrics_hud(frame, lines):
+    """Deseneaza liniile HUD-ului in coltul stanga-sus, pe un fundal intunecat."""
+    if not lines:
+        return
+    line_height = 16
+    height = line_height * len(lines) + 8
+    width = min(frame.shape[1], 8 + 7 * max(len(line) for line in lines))
+    region = frame[:height, :width]
+    region[:] = region // 3 # Fundal semitransparent, fara o copie a intregului frame
+    for i, line in enumerate(lines):
+        cv2.putText(frame, line, (4, line_height * (i + 1)), cv2.FONT_HERSHEY_PLAIN, 0.9,
+                    (255, 255, 255), 1, cv2.LINE_AA)
+
+
+class DropOldestQueue:
+    """Coada marginita: cand este plina, elementul cel mai vechi este aruncat in locul celui nou."""
+
+    def __init__(self, maxsize=2):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Intoarce urmatorul element sau None daca nu a aparut nimic in `timeout` secunde."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LatestFrameGrabber(threading.Thread):
+    """Citeste camera continuu si pastreaza doar cel mai recent frame.
+
+    Consumatorii cer frame-ul cel mai nou prin wait_latest; frame-urile pe care nu
+    le-a cerut nimeni sunt pur si simplu inlocuite, nu se aduna intr-o coada.
+    """
+
+    def __init__(self, cap, timings=None):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.timings = timings
+        self.running = True
+        self.failed = False
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+
+    @property
+    def frames_read(self):
+        return self._seq
+
+    def run(self):
+        while self.running:
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                with self._cond:
+                    self.failed = True
+                    self._cond.notify_all()
+                return
+            if self.timings is not None:
+                self.timings.record("captura", time.perf_counter() - start)
+            with self._cond:
+                self._frame = frame
+                self._timestamp = time.perf_counter()
+                self._seq += 1
+                self._cond.notify_all()
+
+    def wait_latest(self, last_seq, timeout=1.0):
+        """Asteapta un frame mai nou decat last_seq; intoarce (seq, frame, timestamp) sau None."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > last_seq or self.failed or not self.running, timeout)
+            if self._seq <= last_seq:
+                return None
+            return self._seq, self._frame, self._timestamp
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        self.join(timeout=2.0)
+
+
+class AdaptiveDetectionScheduler:
+    """Decide pentru ce frame-uri ruleaza detectia completa (MediaPipe + model).
+
+    Intre detectii se refolosesc ultimele landmark-uri si ultima predictie. Intervalul
+    creste cat timp FPS-ul masurat este sub tinta si mana sta pe loc, si revine la 1
+    cand landmark-urile se misca mai mult decat `motion_threshold` (coordonate normalizate).
+    """
+
+    def __init__(self, enabled=False, target_fps=20.0, max_interval=8, motion_threshold=0.02):
+        self.enabled = enabled
+        self.target_fps = target_fps
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.interval = 1
+        self._frames_since_detection = 0
+        self._last_points = None
+        self._has_detection = False
+        # Pentru FPS-ul efectiv si rata de detectie
+        self._window_start = time.perf_counter()
+        self._window_frames = 0
+        self._window_detections = 0
+        self._frame_times = deque(maxlen=30)
+        self.fps = 0.0
+        self.detections_per_second = 0.0
+
+    def should_detect(self):
+        if not self.enabled or not self._has_detection:
+            return True
+        return self._frames_since_detection + 1 >= self.interval
+
+    def frame_done(self, detected, points, frame_seconds):
+        """Actualizeaza starea dupa un frame; points este (21, 3) pentru prima mana sau None."""
+        self._window_frames += 1
+        self._frame_times.append(frame_seconds)
+        if detected:
+            self._window_detections += 1
+            self._frames_since_detection = 0
+            self._update_interval(points)
+            self._has_detection = True
+        else:
+            self._frames_since_detection += 1
+
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.fps = self._window_frames / elapsed
+            self.detections_per_second = self._window_detections / elapsed
+            self._window_start = now
+            self._window_frames = 0
+            self._window_detections = 0
+
+    def _update_interval(self, points):
+        if not self.enabled:
+            self.interval = 1
+            self._last_points = points
+            return
+
+        previous = self._last_points
+        self._last_points = points
+        if (previous is None) != (points is None):
+            self.interval = 1 # Mana a aparut sau a disparut
+            return
+        if points is not None:
+            motion = float(np.abs(points[:, :2] - previous[:, :2]).max())
+            if motion > self.motion_threshold:
+                self.interval = 1
+                return
+
+        # Ajustam intervalul dupa FPS-ul pe care l-ar permite timpul mediu pe frame
+        avg_frame = sum(self._frame_times) / len(self._frame_times)
+        achievable_fps = 1.0 / avg_frame if avg_frame > 0 else float('inf')
+        if achievable_fps < self.target_fps and self.interval < self.max_interval:
+            self.interval += 1
+        elif achievable_fps > 1.5 * self.target_fps and self.interval > 1:
+            self.interval -= 1
@@ -0,0 +1,240 @@
+"""Formatul de distributie al modelului: metadate JSON separate de array-urile nodurilor.
+
+Doua variante:
+    director (implicit)  model.json + cate un .npy per array, incarcate memory-mapped (rapid)
+    fisier .npz          aceleasi array-uri comprimate, pentru distributie (mai mic)
+
+Exemple:
+    python src/model_artifact.py export --output model_artifact.npz
+    python src/model_artifact.py export --model model_artifact.npz --output model_artifact
+    python src/model_artifact.py benchmark
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime, timezone
+import numpy as np
+
+from compiled_forest import CompiledForest, compile_forest
+from hand_features import FEATURE_COLUMNS
+
+MODEL_ARTIFACT_PATH = "model_artifact"
+ARTIFACT_META = "model.json"
+ARTIFACT_FORMAT = "asl-compiled-forest"
+ARTIFACT_VERSION = 1
+NODE_ARRAYS = ("feature", "threshold", "children", "value", "roots")
+
+
+def _is_compressed(path):
+    return path.endswith('.npz')
+
+
+def _meta_path(path):
+    return path if _is_compressed(path) else os.path.join(path, ARTIFACT_META)
+
+
+def artifact_exists(path=MODEL_ARTIFACT_PATH):
+    return os.path.isfile(_meta_path(path))
+
+
+def artifact_mtime(path=MODEL_ARTIFACT_PATH):
+    """Data modificarii artefactului; model.json este scris ultimul, deci marcheaza un artefact complet."""
+    return os.path.getmtime(_meta_path(path))
+
+
+def artifact_stamp(path=MODEL_ARTIFACT_PATH):
+    try:
+        stat = os.stat(_meta_path(path))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def files_sha256(paths):
+    """Amprenta SHA-256 a fisierelor (ex. setul de date folosit la antrenare)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def training_metadata(model, dataset_files=()):
+    """Parametrii modelului sklearn si amprenta setului de date, pentru model.json."""
+    params = {key: value for key, value in model.get_params().items()
+              if isinstance(value, (int, float, str, bool, type(None)))}
+    metadata = {"estimator": type(model).__name__, "params": params}
+    dataset_files = [path for path in dataset_files if os.path.exists(path)]
+    if dataset_files:
+        metadata["dataset_files"] = [os.path.basename(path) for path in dataset_files]
+        metadata["dataset_sha256"] = files_sha256(dataset_files)
+    return metadata
+
+
+def _node_arrays(forest):
+    return {
+        "feature": np.ascontiguousarray(forest.feature, dtype=np.int32),
+        "threshold": np.ascontiguousarray(forest.threshold, dtype=np.float64),
+        "children": np.ascontiguousarray(forest._children, dtype=np.int64),
+        "value": np.ascontiguousarray(forest.value, dtype=np.float64),
+        "roots": np.ascontiguousarray(forest.roots, dtype=np.int32),
+    }
+
+
+def _build_meta(forest, arrays, metadata):
+    classes = forest.classes_.tolist()
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "classes": classes,
+        "n_features_in": forest.n_features_in_,
+        "feature_columns": FEATURE_COLUMNS,
+        "n_trees": forest.n_trees,
+        "n_nodes": forest.n_nodes,
+        "max_depth": forest.max_depth,
+        "arrays": {name: {"dtype": str(a.dtype), "shape": list(a.shape)} for name, a in arrays.items()},
+        "training": metadata or {},
+    }
+    if "compaction" in forest.metadata:
+        meta["compaction"] = forest.metadata["compaction"]
+    return meta
+
+
+def save_model_artifact(forest, path=MODEL_ARTIFACT_PATH, metadata=None):
+    """Salveaza un CompiledForest; path care se termina in .npz produce varianta comprimata."""
+    arrays = _node_arrays(forest)
+    meta = _build_meta(forest, arrays, metadata)
+
+    if _is_compressed(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as fh:
+            np.savez_compressed(fh, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    os.makedirs(path, exist_ok=True)
+    # Array-urile intai, model.json la final: un cititor nu vede niciodata un artefact pe jumatate
+    for name, array in arrays.items():
+        tmp_path = os.path.join(path, f"{name}.npy.tmp")
+        with open(tmp_path, 'wb') as fh:
+            np.save(fh, array)
+        os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+    tmp_path = os.path.join(path, ARTIFACT_META + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(tmp_path, os.path.join(path, ARTIFACT_META))
+    return path
+
+
+def _check_meta(meta):
+    if meta.get("format") != ARTIFACT_FORMAT or meta.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"Format de model necunoscut: {meta.get('format')} v{meta.get('version')}")
+    if meta.get("feature_columns") != FEATURE_COLUMNS:
+        raise ValueError("Modelul nu foloseste formatul de caracteristici din hand_features.")
+
+
+def load_model_artifact(path=MODEL_ARTIFACT_PATH, mmap=True):
+    """Incarca un artefact ca CompiledForest; varianta director este memory-mapped daca mmap=True."""
+    if _is_compressed(path):
+        with np.load(path, allow_pickle=False) as f:
+            meta = json.loads(str(f['meta']))
+            _check_meta(meta)
+            arrays = {name: f[name] for name in NODE_ARRAYS}
+    else:
+        with open(os.path.join(path, ARTIFACT_META), 'r', encoding='utf-8') as fh:
+            meta = json.load(fh)
+        _check_meta(meta)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                  for name in NODE_ARRAYS}
+
+    for name, spec in meta["arrays"].items():
+        if list(arrays[name].shape) != spec["shape"]:
+            raise ValueError(f"Array-ul '{name}' nu corespunde cu {ARTIFACT_META}.")
+    return CompiledForest(arrays["feature"], arrays["threshold"], None, None, arrays["value"],
+                          arrays["roots"], meta["max_depth"], meta["classes"], meta["n_features_in"],
+                          children=arrays["children"], metadata=meta)
+
+
+def _timed(load, sample, repeats):
+    """(cel mai bun timp de incarcare, cel mai bun timp incarcare + prima predictie), in ms."""
+    load_times, first_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model = load()
+        loaded = time.perf_counter()
+        model.predict_proba(sample)
+        load_times.append((loaded - start) * 1000.0)
+        first_times.append((time.perf_counter() - start) * 1000.0)
+    return min(load_times), min(first_times)
+
+
+def _size_on_disk(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def benchmark_load(model_path, repeats=5):
+    """Compara incarcarea pickle-ului joblib cu artefactul (mmap, fara mmap, comprimat)."""
+    import joblib
+    model = joblib.load(model_path)
+    forest = compile_forest(model)
+    sample = np.zeros((1, forest.n_features_in_), dtype=np.float32)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = save_model_artifact(forest, os.path.join(tmp, MODEL_ARTIFACT_PATH))
+        artifact_npz = save_model_artifact(forest, os.path.join(tmp, MODEL_ARTIFACT_PATH + ".npz"))
+        variants = [
+            ("joblib", model_path, lambda: joblib.load(model_path)),
+            ("artifact-mmap", artifact_dir, lambda: load_model_artifact(artifact_dir, mmap=True)),
+            ("artifact", artifact_dir, lambda: load_model_artifact(artifact_dir, mmap=False)),
+            ("artifact-npz", artifact_npz, lambda: load_model_artifact(artifact_npz)),
+        ]
+        for name, path, load in variants:
+            load_ms, first_ms = _timed(load, sample, repeats)
+            results.append({"variant": name, "size_mb": round(_size_on_disk(path) / 1e6, 2),
+                            "load_ms": round(load_ms, 2), "load_and_predict_ms": round(first_ms, 2)})
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export si benchmark pentru artefactul modelului.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="converteste model.joblib (sau alt artefact) intr-un artefact")
+    export.add_argument("--model", default="./model.joblib", help="model.joblib, un director artefact sau un .npz")
+    export.add_argument("--output", default=MODEL_ARTIFACT_PATH, help="director (mmap) sau fisier .npz (comprimat)")
+    bench = commands.add_parser("benchmark", help="compara timpul de incarcare cu pickle-ul joblib")
+    bench.add_argument("--model", default="./model.joblib")
+    bench.add_argument("--repeats", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "export":
+        if artifact_exists(args.model):
+            # Ex. artefactul comprimat descarcat, despachetat pentru incarcare memory-mapped
+            forest = load_model_artifact(args.model, mmap=False)
+            path = save_model_artifact(forest, args.output, forest.metadata.get("training"))
+        else:
+            import joblib
+            model = joblib.load(args.model)
+            path = save_model_artifact(compile_forest(model), args.output, training_metadata(model))
+        print(f"Artefact salvat in '{path}' ({_size_on_disk(path) / 1e6:.2f} MB)")
+        return 0
+
+    print(f"{'varianta':<16}{'MB':>8}{'incarcare ms':>15}{'+ predictie ms':>17}")
+    for row in benchmark_load(args.model, args.repeats):
+        print(f"{row['variant']:<16}{row['size_mb']:>8}{row['load_ms']:>15}{row['load_and_predict_ms']:>17}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
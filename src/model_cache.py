@@ -0,0 +1,61 @@
+import os
+import threading
+
+from inference_engine import load_inference_model, MODEL_PATH
+from model_artifact import MODEL_ARTIFACT_PATH, artifact_stamp
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ModelCache:
+    """Cache-ul modelului pentru tot procesul.
+
+    Modelul este incarcat o singura data si refolosit intre sesiunile ferestrei de test;
+    se reincarca doar cand se schimba data modificarii fisierelor (ex. dupa o antrenare noua).
+    Un apel get in timpul unei incarcari din alt thread asteapta rezultatul ei, nu incarca din nou.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {} # (backend, model_path) -> (amprenta fisierelor, model)
+        self.loads = 0
+        self.hits = 0
+
+    def _stamp(self, backend, model_path, compiled_path):
+        if backend == "compiled":
+            return _file_stamp(model_path), artifact_stamp(compiled_path)
+        return _file_stamp(model_path)
+
+    def get(self, backend="compiled", model_path=MODEL_PATH, compiled_path=MODEL_ARTIFACT_PATH, mmap=False):
+        key = (backend, os.path.normpath(model_path))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self._stamp(backend, model_path, compiled_path):
+                self.hits += 1
+                return entry[1]
+
+            # Amprenta de dinainte de incarcare: daca fisierul se schimba intre timp, urmatorul get il reincarca
+            stamp = self._stamp(backend, model_path, compiled_path)
+            model = load_inference_model(backend, model_path=model_path, compiled_path=compiled_path,
+                                         mmap_mode='r' if mmap else None)
+            self._entries[key] = (stamp, model)
+            self.loads += 1
+            return model
+
+    def is_current(self, backend="compiled", model_path=MODEL_PATH, compiled_path=MODEL_ARTIFACT_PATH):
+        entry = self._entries.get((backend, os.path.normpath(model_path)))
+        return entry is not None and entry[0] == self._stamp(backend, model_path, compiled_path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Instanta folosita de GUI (fereastra de test si incarcarea dupa autentificare)
+model_cache = ModelCache()
@@ -1,12 +1,27 @@
 import os
 import joblib
-import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from PySide6.QtCore import QThread, Signal
 
+from compiled_forest import compile_forest
+from forest_compaction import (
+    DEFAULT_TOLERANCE, VALIDATION_SIZE, apply_compaction, compact_forest, compaction_report, format_report
+)
+from hyperparameter_search import (
+    DEFAULT_CV_FOLDS, iter_candidates, run_search, select_candidate, format_params
+)
+from model_artifact import MODEL_ARTIFACT_PATH, save_model_artifact, training_metadata
+from dataset_io import (
+    dataset_exists, dataset_paths, load_dataset, load_dataset_csv, labels_from_indices,
+    DATASET_PREFIX, DATASET_CSV
+)
+
+# Parametrii folositi cand nu se face cautarea de hiperparametri
+DEFAULT_FOREST_PARAMS = {"n_estimators": 200, "max_depth": 20, "min_samples_split": 5}
+
 
 class ModelTrainingWorker(QThread):
     
@@ -17,7 +32,17 @@ class ModelTrainingWorker(QThread):
 
     def __init__(self):
         super().__init__()
+        self.dataset_prefix = DATASET_PREFIX
         self.running = True
+        # Modul de cautare: grila (sau o selectie aleatoare din ea) evaluata cu validare incrucisata
+        self.search_mode = False
+        self.param_grid = None # None = DEFAULT_PARAM_GRID
+        self.search_iterations = None # None = toata grila
+        self.cv_folds = DEFAULT_CV_FOLDS
+        self.min_accuracy = None # Pragul de acuratete; se alege cel mai rapid model care il atinge
+        # Compactarea dupa antrenare: mai putini arbori / adancime mai mica, in limita tolerantei
+        self.compact_model = False
+        self.compaction_tolerance = DEFAULT_TOLERANCE
 
 
     def run(self):
@@ -26,25 +51,25 @@ class ModelTrainingWorker(QThread):
         evaluation_results = {}
 
         try:
-            # Verificam daca dataset.csv exista
-            if not os.path.exists('dataset.csv'):
-                self.finished.emit(False, "Fisierul 'dataset.csv' nu exista. Asigurati-va ca ati creat dataset-ul in prealabil.", evaluation_results)
+            # Preferam setul de date binar; CSV-ul ramane doar pentru compatibilitate
+            if dataset_exists(self.dataset_prefix):
+                X, labels, class_names = load_dataset(self.dataset_prefix, mmap=True)
+                dataset_files = dataset_paths(self.dataset_prefix)
+                self.log_message.emit(f"Set de date binar '{self.dataset_prefix}' incarcat.")
+            elif os.path.exists(DATASET_CSV):
+                X, labels, class_names = load_dataset_csv(DATASET_CSV)
+                dataset_files = [DATASET_CSV]
+                self.log_message.emit(f"Set de date incarcat din '{DATASET_CSV}'.")
+            else:
+                self.finished.emit(False, "Setul de date nu exista. Asigurati-va ca ati creat dataset-ul in prealabil.", evaluation_results)
                 return
-            
-            # Incarcam datele din 'dataset.csv'
-            df = pd.read_csv('dataset.csv')
 
-            if df.empty:
-                self.finished.emit(False, "Fisierul 'data.csv' este gol. Asigurati-va ca ati creat dataset-ul in prealabil.", evaluation_results)
-                return
-            
-            if 'label' not in df.columns:
-                self.finished.emit(False, "Coloana 'label' nu exista in 'datset.csv'. Asigurati-va ca ati creat dataset-ul corect.", evaluation_results)
+            if X.shape[0] == 0:
+                self.finished.emit(False, "Setul de date este gol. Asigurati-va ca ati creat dataset-ul in prealabil.", evaluation_results)
                 return
-            
+
             # Separarea caracteristicilor si a etichetelor
-            X = df.drop(columns=['label'])
-            y = df['label'].values
+            y = labels_from_indices(labels, class_names)
 
             if len(np.unique(y)) < 2:
                 self.finished.emit(False, "Setul de date contine mai putin de 2 clase. Antrenarea modelului necesita cel putin 2 clase diferite.", evaluation_results)
@@ -63,13 +88,26 @@ class ModelTrainingWorker(QThread):
                 self.finished.emit(False, f"Eroare la impartirea setului de date: {str(e)}", evaluation_results)
                 return
 
+            params = dict(DEFAULT_FOREST_PARAMS)
+            if self.search_mode:
+                params = self.search_parameters(X_train, y_train, evaluation_results)
+                if params is None:
+                    self.finished.emit(False, "Cautarea hiperparametrilor a fost oprita.", evaluation_results)
+                    return
+
+            compaction = None
+            if self.compact_model:
+                try:
+                    compaction = self.choose_compaction(params, X_train, y_train)
+                except ValueError as e:
+                    self.finished.emit(False, f"Eroare la separarea setului de validare pentru compactare: {str(e)}", evaluation_results)
+                    return
+
             # Initializarea si antrenarea modelului
-            self.log_message.emit("Antrenam modelul...")
+            self.log_message.emit(f"Antrenam modelul ({format_params(params)})...")
             
             model = RandomForestClassifier(
-                n_estimators = 200,
-                max_depth = 20,
-                min_samples_split = 5,
+                **params,
                 random_state = 42,
                 n_jobs = -1
             )
@@ -95,10 +133,68 @@ class ModelTrainingWorker(QThread):
             joblib.dump(model, 'model.joblib')
             self.log_message.emit("Modelul a fost salvat in 'model_a.joblib'.")
 
+            # Varianta aplatizata (metadate + array-uri memory-mapped), folosita de backend-ul "compiled"
+            forest = compile_forest(model)
+            if compaction is not None:
+                forest = self.compact(forest, compaction, X_test, y_test, evaluation_results)
+            save_model_artifact(forest, MODEL_ARTIFACT_PATH, training_metadata(model, dataset_files))
+            self.log_message.emit(f"Artefactul modelului a fost salvat in '{MODEL_ARTIFACT_PATH}'.")
+
             self.finished.emit(True, "Antrenarea modelului a fost finalizata cu succes.", evaluation_results)
         except Exception as e:
             self.log_message.emit(f"A aparut o eroare la antrenarea modelului: {str(e)}")
             self.finished.emit(False, f"A aparut o eroare la antrenarea modelului: {str(e)}", evaluation_results)
 
+    def search_parameters(self, X_train, y_train, evaluation_results):
+        """Ruleaza cautarea pe setul de antrenare si intoarce parametrii alesi (None daca a fost oprita)."""
+        candidates = iter_candidates(self.param_grid, self.search_iterations)
+        self.log_message.emit(f"Cautare hiperparametri: {len(candidates)} candidati, validare incrucisata cu {self.cv_folds} fold-uri...")
+
+        def on_result(result, done):
+            if result["stopped_early"]:
+                self.log_message.emit(
+                    f"[{done}/{len(candidates)}] {format_params(result['params'])}: oprit dupa {result['folds']} fold-uri "
+                    f"({result['accuracy'] * 100:.2f}%)")
+            else:
+                self.log_message.emit(
+                    f"[{done}/{len(candidates)}] {format_params(result['params'])}: acuratete {result['accuracy'] * 100:.2f}% "
+                    f"(± {result['std'] * 100:.2f}), latenta {result['latency_ms']:.3f} ms/esantion, {result['seconds']:.1f} s")
+
+        results = run_search(X_train, y_train, candidates, self.cv_folds,
+                             on_result=on_result, should_stop=lambda: not self.running)
+        if not self.running:
+            return None
+
+        chosen = select_candidate(results, self.min_accuracy)
+        summary = (f"{format_params(chosen['params'])} - acuratete CV {chosen['accuracy'] * 100:.2f}%, "
+                   f"latenta {chosen['latency_ms']:.3f} ms/esantion")
+        self.log_message.emit(f"Candidat ales: {summary}")
+        evaluation_results['search'] = summary
+        return dict(chosen['params'])
+
+    def choose_compaction(self, params, X_train, y_train):
+        """Alege adancimea si numarul de arbori pe o validare nevazuta la antrenare.
+
+        Padurea folosita pentru alegere este antrenata fara setul de validare si apoi aruncata;
+        modelul final este antrenat pe tot setul de antrenare, iar setul de testare ramane doar pentru raport.
+        """
+        X_fit, X_val, y_fit, _ = train_test_split(
+            X_train, y_train, test_size=VALIDATION_SIZE, random_state=42, shuffle=True, stratify=y_train)
+        self.log_message.emit(f"Compactare (toleranta {self.compaction_tolerance * 100:.2f} puncte de acuratete): "
+                              f"alegem adancimea si arborii pe {len(X_val)} exemple de validare...")
+        model = RandomForestClassifier(**params, random_state=42, n_jobs=-1)
+        model.fit(X_fit, y_fit)
+        compaction = compact_forest(compile_forest(model), X_val, self.compaction_tolerance).metadata["compaction"]
+        self.log_message.emit(f"Compactare aleasa: {compaction['n_trees']} arbori, adancime {compaction['max_depth']}.")
+        return compaction
+
+    def compact(self, forest, compaction, X_test, y_test, evaluation_results):
+        """Aplica compactarea aleasa padurii finale si raporteaza diferentele pe setul de testare."""
+        compacted = apply_compaction(forest, compaction)
+        report = format_report(compaction_report(forest, compacted, X_test, y_test))
+        self.log_message.emit(f"Raport compactare:\n{report}")
+        evaluation_results['compaction_report'] = report
+        return compacted
+
     def stop(self):
            self.running = False     
\ No newline at end of file
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class PredictionSmoother:
+    """Medie mobila exponentiala peste vectorii predict_proba ai frame-urilor succesive."""
+
+    def __init__(self, alpha=0.4):
+        self.alpha = alpha # Ponderea frame-ului curent; valori mici = mai stabil, dar reactie mai lenta
+        self.state = None
+
+    def update(self, probabilities):
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        if self.state is None or self.state.shape != probabilities.shape:
+            self.state = probabilities.copy()
+        else:
+            self.state *= 1.0 - self.alpha
+            self.state += self.alpha * probabilities
+        return self.state
+
+    def reset(self):
+        self.state = None
+
+
+class LetterCommitter:
+    """Accepta o litera cand ramane aceeasi `stable_frames` frame-uri la rand peste `min_confidence`.
+
+    Aceeasi litera nu este acceptata de doua ori la rand decat dupa ce mana dispare
+    din cadru (astfel "LL" se obtine retragand mana intre semne).
+    """
+
+    def __init__(self, stable_frames=8, min_confidence=0.6):
+        self.stable_frames = stable_frames
+        self.min_confidence = min_confidence
+        self.word = ""
+        self._candidate = None
+        self._count = 0
+        self._last_committed = None
+
+    def update(self, letter, confidence):
+        """Intoarce litera acceptata la acest frame sau None."""
+        if confidence < self.min_confidence:
+            self._candidate = None
+            self._count = 0
+            return None
+
+        if letter == self._candidate:
+            self._count += 1
+        else:
+            self._candidate = letter
+            self._count = 1
+
+        if self._count == self.stable_frames and letter != self._last_committed:
+            self._last_committed = letter
+            self.word += letter
+            return letter
+        return None
+
+    def hand_lost(self):
+        self._candidate = None
+        self._count = 0
+        self._last_committed = None
+
+    def clear_word(self):
+        self.word = ""
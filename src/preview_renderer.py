@@ -0,0 +1,84 @@
+import time
+import threading
+import cv2
+from PySide6.QtGui import QImage
+from PySide6.QtCore import QThread, Signal
+
+PREVIEW_FPS = 30 # Rata maxima implicita a previzualizarii
+
+
+class PreviewRenderer(QThread):
+    """Pregateste imaginile de previzualizare pe un thread separat de GUI.
+
+    Frame-ul cel mai nou (din FrameRing sau trimis prin submit) este redimensionat cu
+    cv2.resize la marimea etichetei, convertit in RGB si transformat in QImage. GUI-ul
+    primeste prin image_ready o imagine gata de afisat, de cel mult max_fps ori pe secunda.
+    """
+
+    image_ready = Signal(QImage)
+
+    def __init__(self, target_width, target_height, max_fps=PREVIEW_FPS, frame_ring=None):
+        super().__init__()
+        self.target_width = target_width
+        self.target_height = target_height
+        self.max_fps = max_fps
+        self.frame_ring = frame_ring
+        self.timings = None # StageTimings optional; masoara etapa "conversie"
+        self.running = True
+        self._cond = threading.Condition()
+        self._pending = None
+        self._ring_seq = 0
+        self._ring_buffer = None
+
+    def submit(self, frame):
+        """Inlocuieste frame-ul in asteptare; poate fi apelata din orice thread."""
+        with self._cond:
+            self._pending = frame
+            self._cond.notify()
+
+    def _next_frame(self, timeout):
+        if self.frame_ring is not None:
+            latest = self.frame_ring.read_latest(self._ring_seq, self._ring_buffer)
+            if latest is None:
+                time.sleep(min(timeout, 0.005))
+                return None
+            self._ring_seq, self._ring_buffer = latest
+            return self._ring_buffer
+
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending is not None or not self.running, timeout)
+            frame, self._pending = self._pending, None
+            return frame
+
+    def render(self, frame):
+        h, w = frame.shape[:2]
+        scale = min(self.target_width / w, self.target_height / h)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if size != (w, h):
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, size, interpolation=interpolation)
+        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image = QImage(rgb_image.data, size[0], size[1], 3 * size[0], QImage.Format.Format_RGB888)
+        return image.copy() # QImage nu detine memoria array-ului; copia supravietuieste thread-ului
+
+    def run(self):
+        next_render = 0.0
+        while self.running:
+            delay = next_render - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            frame = self._next_frame(timeout=0.1)
+            if frame is None:
+                continue
+            start = time.perf_counter()
+            next_render = start + 1.0 / max(1, self.max_fps)
+            image = self.render(frame)
+            if self.timings is not None:
+                self.timings.record("conversie", time.perf_counter() - start)
+            self.image_ready.emit(image)
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        self.wait()
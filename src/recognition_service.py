@@ -0,0 +1,564 @@
+"""Serviciu local de recunoastere (HTTP + WebSocket), fara Qt, pentru mai multe statii.
+
+Modelul se incarca o singura data; cererile concurente sunt grupate de MicroBatcher
+intr-o singura evaluare a padurii, asteptand cel mult cateva milisecunde.
+
+Rute:
+    POST /predict          JSON {"landmarks": [63 valori]} sau {"instances": [[63 valori], ...]}
+    POST /predict/frame    corpul este un JPEG (Content-Type: image/jpeg)
+    GET  /metrics          latenta p50/p99, debit, dimensiunea medie a loturilor
+    GET  /health
+    GET  /ws               WebSocket: mesaje text JSON ca la /predict, mesaje binare JPEG
+
+Pornire:
+    python src/recognition_service.py --port 8765
+"""
+import os
+import sys
+import json
+import time
+import queue
+import struct
+import base64
+import socket
+import hashlib
+import argparse
+import threading
+import http.client
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import cv2
+
+from landmark_extraction import EXTRACT_OK, create_hands_detector, extract_landmarks
+from inference_engine import InferenceEngine, load_inference_model, letter_for_label, INFERENCE_BACKENDS, MODEL_PATH
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 8 * 1024 * 1024 # Un frame JPEG mare are cateva sute de KB
+REQUEST_TIMEOUT = 5.0
+DEFAULT_DETECTORS = 2 # Detectoare MediaPipe pentru /predict/frame, partajate de toate conexiunile
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_TEXT, WS_BINARY, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class ServiceStats:
+    """Contoare pentru /metrics; latentele recente sunt pastrate intr-o fereastra marginita."""
+
+    def __init__(self, window=10000, throughput_window=10.0):
+        self.throughput_window = throughput_window
+        self._latencies = deque(maxlen=window)
+        self._completed_at = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.max_batch_seen = 0
+
+    def record_request(self, seconds, ok=True):
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self._latencies.append(seconds)
+            self._completed_at.append(time.perf_counter())
+
+    def record_batch(self, size):
+        with self._lock:
+            self.batches += 1
+            self.batched_items += size
+            self.max_batch_seen = max(self.max_batch_seen, size)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies, dtype=np.float64) * 1000.0
+            cutoff = time.perf_counter() - self.throughput_window
+            recent = sum(1 for t in self._completed_at if t >= cutoff)
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "batches": self.batches,
+                "mean_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+                "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3) if latencies.size else None,
+                "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3) if latencies.size else None,
+                "throughput_rps": round(recent / self.throughput_window, 2),
+                "uptime_s": round(time.time() - self.started_at, 1),
+            }
+
+
+class MicroBatcher:
+    """Grupeaza vectorii trimisi din mai multe thread-uri intr-un singur predict_proba.
+
+    Dupa prima cerere se mai asteapta cel mult max_wait_ms pentru altele (pana la
+    max_batch); modelul este folosit doar de thread-ul acesta.
+    """
+
+    def __init__(self, engine, max_batch=64, max_wait_ms=2.0, stats=None):
+        if not isinstance(engine, InferenceEngine):
+            raise TypeError(f"MicroBatcher asteapta un InferenceEngine, nu {type(engine).__name__}.")
+        self.engine = engine
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.stats = stats
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._batch_loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """Intoarce un Future cu Prediction pentru un vector de caracteristici."""
+        features = np.asarray(features, dtype=np.float32).reshape(-1)
+        if features.shape[0] != self.engine.n_features_in_:
+            raise ValueError(f"Se asteapta {self.engine.n_features_in_} caracteristici, dar s-au gasit {features.shape[0]}")
+        future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def predict(self, features, timeout=REQUEST_TIMEOUT):
+        return self.submit(features).result(timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None) # Oprim dupa lotul curent
+                break
+            batch.append(item)
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            # Orice eroare ajunge in Future-urile lotului; thread-ul de loturi nu trebuie sa se opreasca
+            try:
+                proba = self.engine.predict_proba(np.stack([features for features, _ in batch]))
+                predictions = [self.engine.prediction_from_proba(row) for row in proba]
+                if self.stats is not None:
+                    self.stats.record_batch(len(batch))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), prediction in zip(batch, predictions):
+                future.set_result(prediction)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class DetectorPool:
+    """Cel mult `size` detectoare MediaPipe, create la nevoie si imprumutate pe durata unei cereri.
+
+    Numarul de detectoare nu creste cu numarul de conexiuni; close le elibereaza pe toate
+    (cele imprumutate sunt inchise la returnare).
+    """
+
+    def __init__(self, size=DEFAULT_DETECTORS, factory=create_hands_detector):
+        self.size = max(1, int(size))
+        self._factory = factory
+        self._cond = threading.Condition()
+        self._idle = []
+        self._created = 0
+        self._closed = False
+
+    def _acquire(self, timeout):
+        with self._cond:
+            available = lambda: self._closed or self._idle or self._created < self.size
+            if not self._cond.wait_for(available, timeout):
+                raise TimeoutError("Niciun detector liber; serviciul este ocupat.")
+            if self._closed:
+                raise RuntimeError("Serviciul a fost oprit.")
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self._factory() # In afara lock-ului: crearea dureaza
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, hands):
+        with self._cond:
+            if not self._closed:
+                self._idle.append(hands)
+                self._cond.notify()
+                return
+            self._created -= 1
+        hands.close()
+
+    @contextmanager
+    def detector(self, timeout=REQUEST_TIMEOUT):
+        hands = self._acquire(timeout)
+        try:
+            yield hands
+        finally:
+            self._release(hands)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for hands in idle:
+            hands.close()
+
+
+def prediction_to_dict(prediction):
+    label = prediction.label.item() if isinstance(prediction.label, np.generic) else prediction.label
+    return {
+        "status": EXTRACT_OK,
+        "label": label,
+        "letter": letter_for_label(label),
+        "confidence": prediction.confidence,
+        "top_k": [[letter_for_label(l), p] for l, p in prediction.top_k],
+    }
+
+
+def _ws_encode(opcode, payload, mask=False):
+    """Un cadru WebSocket complet (FIN=1); clientii trebuie sa isi mascheze cadrele."""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack(">H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack(">Q", length)
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = _ws_apply_mask(payload, key)
+    return bytes(header) + payload
+
+
+def _ws_apply_mask(payload, key):
+    data = np.frombuffer(payload, dtype=np.uint8)
+    return (data ^ np.resize(np.frombuffer(key, dtype=np.uint8), data.shape[0])).tobytes()
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if data is None or len(data) < size:
+        raise ConnectionError("Conexiunea WebSocket a fost inchisa.")
+    return data
+
+
+def _ws_read_message(stream):
+    """Citeste un mesaj (reunind fragmentele); intoarce (opcode, payload)."""
+    opcode = None
+    chunks = []
+    while True:
+        b0, b1 = _read_exact(stream, 2)
+        frame_opcode = b0 & 0x0F
+        length = b1 & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", _read_exact(stream, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", _read_exact(stream, 8))[0]
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Mesaj WebSocket prea mare.")
+        key = _read_exact(stream, 4) if b1 & 0x80 else None
+        payload = _read_exact(stream, length) if length else b""
+        if key is not None and payload:
+            payload = _ws_apply_mask(payload, key)
+
+        if frame_opcode >= 0x8: # Cadrele de control pot aparea intre fragmente
+            if opcode is None:
+                return frame_opcode, payload
+            continue
+        if frame_opcode != 0:
+            opcode = frame_opcode
+        chunks.append(payload)
+        if b0 & 0x80:
+            return opcode, b"".join(chunks)
+
+
+class RecognitionService:
+    """Leaga modelul, MicroBatcher-ul si serverul HTTP; poate rula in fundal (start) sau blocant."""
+
+    def __init__(self, engine, host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=64, max_wait_ms=2.0,
+                 num_detectors=DEFAULT_DETECTORS):
+        self.engine = engine
+        self.stats = ServiceStats()
+        self.batcher = MicroBatcher(engine, max_batch=max_batch, max_wait_ms=max_wait_ms, stats=self.stats)
+        self.detectors = DetectorPool(num_detectors)
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def predict_landmarks(self, landmarks):
+        return prediction_to_dict(self.batcher.predict(landmarks))
+
+    def predict_instances(self, instances):
+        futures = [self.batcher.submit(features) for features in instances]
+        return [prediction_to_dict(future.result(REQUEST_TIMEOUT)) for future in futures]
+
+    def predict_frame(self, jpeg_bytes):
+        image = cv2.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Frame-ul nu este o imagine JPEG valida.")
+        with self.detectors.detector() as hands:
+            status, features = extract_landmarks(hands, image)
+        if status != EXTRACT_OK:
+            return {"status": status}
+        return self.predict_landmarks(features)
+
+    def handle_json(self, payload):
+        request = json.loads(payload)
+        if "instances" in request:
+            return {"predictions": self.predict_instances(request["instances"])}
+        if "landmarks" in request:
+            return self.predict_landmarks(request["landmarks"])
+        raise ValueError("Cererea trebuie sa contina 'landmarks' sau 'instances'.")
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.batcher.close()
+        self.detectors.close()
+
+
+def _make_handler(service):
+    class RecognitionHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive: statiile refolosesc conexiunea
+
+        def log_message(self, format, *args):
+            pass # Fara un rand in consola pentru fiecare cerere
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_body(self):
+            # Fara o lungime valida nu stim unde se termina corpul; conexiunea keep-alive se inchide
+            value = self.headers.get("Content-Length")
+            try:
+                length = int(value)
+            except (TypeError, ValueError):
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                raise ValueError("Antetul Content-Length lipseste sau este invalid.")
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True # Corpul necitit ar fi interpretat ca cererea urmatoare
+                raise ValueError("Cererea este prea mare.")
+            return self.rfile.read(length)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/metrics":
+                self._send_json(200, service.stats.snapshot())
+            elif self.path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+                self._serve_websocket()
+            else:
+                self._send_json(404, {"error": "Ruta necunoscuta."})
+
+        def do_POST(self):
+            start = time.perf_counter()
+            try:
+                body = self._read_body()
+                if self.path == "/predict":
+                    result = service.handle_json(body)
+                elif self.path == "/predict/frame":
+                    result = service.predict_frame(body)
+                else:
+                    self._send_json(404, {"error": "Ruta necunoscuta."})
+                    return
+            except (ValueError, KeyError, TypeError) as e:
+                service.stats.record_request(time.perf_counter() - start, ok=False)
+                self._send_json(400, {"error": str(e)})
+                return
+            except TimeoutError as e:
+                service.stats.record_request(time.perf_counter() - start, ok=False)
+                self._send_json(503, {"error": str(e) or "Cererea a depasit timpul de asteptare."})
+                return
+            except Exception as e:
+                service.stats.record_request(time.perf_counter() - start, ok=False)
+                self._send_json(500, {"error": str(e)})
+                return
+            service.stats.record_request(time.perf_counter() - start)
+            self._send_json(200, result)
+
+        def _serve_websocket(self):
+            key = self.headers.get("Sec-WebSocket-Key", "")
+            accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+            self.send_response(101, "Switching Protocols")
+            self.send_header("Upgrade", "websocket")
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Sec-WebSocket-Accept", accept)
+            self.end_headers()
+            self.wfile.flush()
+
+            while True:
+                try:
+                    opcode, payload = _ws_read_message(self.rfile)
+                except (ConnectionError, ValueError, OSError):
+                    break
+                if opcode == WS_CLOSE:
+                    self.wfile.write(_ws_encode(WS_CLOSE, payload[:2]))
+                    break
+                if opcode == WS_PING:
+                    self.wfile.write(_ws_encode(WS_PONG, payload))
+                    continue
+                if opcode not in (WS_TEXT, WS_BINARY):
+                    continue
+
+                start = time.perf_counter()
+                ok = True
+                try:
+                    result = service.handle_json(payload) if opcode == WS_TEXT else service.predict_frame(payload)
+                except Exception as e:
+                    ok = False
+                    result = {"error": str(e)}
+                service.stats.record_request(time.perf_counter() - start, ok=ok)
+                self.wfile.write(_ws_encode(WS_TEXT, json.dumps(result).encode("utf-8")))
+            self.close_connection = True
+
+    return RecognitionHandler
+
+
+class RecognitionClient:
+    """Client HTTP simplu (o conexiune keep-alive); folosit de statii si pentru teste locale."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=REQUEST_TIMEOUT):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, body=None, content_type="application/json"):
+        headers = {"Content-Type": content_type} if body is not None else {}
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"Eroare {response.status}: {data.get('error')}")
+        return data
+
+    def predict(self, landmarks):
+        return self._request("POST", "/predict", json.dumps({"landmarks": [float(v) for v in landmarks]}))
+
+    def predict_many(self, instances):
+        body = json.dumps({"instances": [[float(v) for v in row] for row in instances]})
+        return self._request("POST", "/predict", body)["predictions"]
+
+    def predict_frame(self, jpeg_bytes):
+        return self._request("POST", "/predict/frame", jpeg_bytes, content_type="image/jpeg")
+
+    def metrics(self):
+        return self._request("GET", "/metrics")
+
+    def close(self):
+        self.connection.close()
+
+
+class WebSocketClient:
+    """Client WebSocket minimal pentru /ws: fiecare mesaj trimis primeste un raspuns JSON."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=REQUEST_TIMEOUT):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        self.sock.sendall((
+            f"GET /ws HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode("ascii"))
+        self.stream = self.sock.makefile("rb")
+        status_line = self.stream.readline()
+        if b" 101 " not in status_line:
+            raise RuntimeError(f"Serverul a refuzat WebSocket-ul: {status_line!r}")
+        while self.stream.readline() not in (b"\r\n", b""):
+            pass
+
+    def _exchange(self, opcode, payload):
+        self.sock.sendall(_ws_encode(opcode, payload, mask=True))
+        _, reply = _ws_read_message(self.stream)
+        return json.loads(reply)
+
+    def predict(self, landmarks):
+        return self._exchange(WS_TEXT, json.dumps({"landmarks": [float(v) for v in landmarks]}).encode("utf-8"))
+
+    def predict_frame(self, jpeg_bytes):
+        return self._exchange(WS_BINARY, jpeg_bytes)
+
+    def close(self):
+        try:
+            self.sock.sendall(_ws_encode(WS_CLOSE, struct.pack(">H", 1000), mask=True))
+        except OSError:
+            pass
+        self.stream.close()
+        self.sock.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serviciu local de recunoastere ASL (HTTP si WebSocket).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", default=MODEL_PATH, help="modelul joblib (implicit ./model.joblib)")
+    parser.add_argument("--artifact", help="artefactul modelului (director sau .npz); implicit <model>_artifact")
+    parser.add_argument("--backend", choices=INFERENCE_BACKENDS, default="compiled")
+    parser.add_argument("--max-batch", type=int, default=64, help="numarul maxim de cereri evaluate impreuna")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="cat se asteapta alte cereri dupa prima dintr-un lot")
+    parser.add_argument("--detectors", type=int, default=DEFAULT_DETECTORS,
+                        help="detectoare MediaPipe pentru /predict/frame, partajate de conexiuni")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    artifact_path = args.artifact or os.path.splitext(args.model)[0] + "_artifact"
+    engine = InferenceEngine(load_inference_model(args.backend, model_path=args.model, compiled_path=artifact_path))
+    service = RecognitionService(engine, args.host, args.port, args.max_batch, args.max_wait_ms, args.detectors)
+    host, port = service.address
+    print(f"Serviciul de recunoastere asculta pe http://{host}:{port} (ws://{host}:{port}/ws)")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server.server_close()
+        service.batcher.close()
+        service.detectors.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
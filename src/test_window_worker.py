@@ -1,36 +1,59 @@
+import time
+import json
+import threading
 import cv2
-import joblib
 import mediapipe as mp
 import numpy as np
 from PySide6.QtWidgets import ( QDialog, QVBoxLayout, QHBoxLayout,
                                 QLabel, QPushButton, QTextEdit, QMessageBox,
-                                QApplication
+                                QCheckBox, QSpinBox
 )
 
 from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtCore import ( QThread, Signal, Slot,
-                            QTimer, Qt
+                            Qt
 )
 
+from hand_features import landmarks_to_array, wrist_relative_features, bounding_box
+from inference_engine import InferenceEngine, letter_for_label
+from model_cache import model_cache
+from live_pipeline import (
+    StageTimings, DropOldestQueue, LatestFrameGrabber, AdaptiveDetectionScheduler,
+    pipeline_metrics, metrics_hud_lines, draw_metrics_hud, format_stage_stats
+)
+from prediction_smoothing import PredictionSmoother, LetterCommitter
+from preview_renderer import PreviewRenderer, PREVIEW_FPS
+
+LIVE_METRICS_PATH = "live_metrics.jsonl" # Metricile periodice, cate un obiect JSON pe linie
+
 
 class InferenceWorker(QThread):
 
     frame_ready = Signal(np.ndarray) # Emite frame-ul procesat (cu detectii) catre GUI
     log_message = Signal(str) # Emite mesaje de log (ex: erori, status)
     prediction_info = Signal(str, float) # Emite caracterul prezis si confidenta
+    detection_stats = Signal(float, float) # Emite (FPS efectiv, detectii pe secunda)
+    letter_committed = Signal(str, str) # Emite (litera acceptata, cuvantul format pana acum)
+    stage_metrics = Signal(dict) # Emite p50/p95/max pe etape si contoarele de frame-uri (o data pe secunda)
     finished = Signal() # Emite cand thread-ul se termina
 
-    def __init__(self):
+    def __init__(self, backend="compiled"):
         super().__init__()
         self.running = True
+        self.backend = backend # "compiled" (padure aplatizata) sau "sklearn"
         self.model = None
+        self.engine = None
         self.mp_hands = mp.solutions.hands
         self.hands = None
-        self.labels_dict = {
-            0: 'A', 1: 'B', 2: 'C', 3: 'D', 4: 'E', 5: 'F', 6: 'G', 7: 'H', 8: 'I', 9: 'K',
-            10: 'L', 11: 'M', 12: 'N', 13: 'O', 14: 'P', 15: 'Q', 16: 'R', 17: 'S', 18: 'T',
-            19: 'U', 20: 'V', 21: 'W', 22: 'X', 23: 'Y'
-        }
+        # Instrumentare: timpi pe etape si contoare de frame-uri; dezactivata, record nu face nimic
+        self.timings = StageTimings()
+        self.show_hud = False # Metricile desenate peste frame
+        self.metrics_path = None # Fisierul .jsonl in care se adauga metricile (None = doar log)
+        self.metrics_interval = 5.0 # Secunde intre doua rapoarte in log / fisier
+        self._hud_lines = []
+        self.scheduler = AdaptiveDetectionScheduler() # Detectie la fiecare frame pana la activarea modului adaptiv
+        self.smoother = PredictionSmoother() # Netezeste probabilitatile intre frame-uri (fara apeluri in plus la model)
+        self.committer = LetterCommitter()
         self.color_dict = {
             'A': (0, 255, 0), 'B': (255, 0, 0), 'C': (0, 0, 255), 'D': (255, 255, 0), 'E': (0, 255, 255), 'F': (255, 0, 255),
             'G': (255, 128, 0), 'H': (128, 255, 0), 'I': (0, 128, 255), 'K': (128, 0, 255), 'L': (255, 128, 255),
@@ -42,8 +65,11 @@ class InferenceWorker(QThread):
     def run(self):
         self.log_message.emit("Incarcare model pentru verificare...")
         try:
-            self.model = joblib.load('./model.joblib')
-            self.log_message.emit(f"Model incarcat cu succes: {type(self.model)}")
+            reused = model_cache.is_current(self.backend)
+            self.model = model_cache.get(self.backend) # Refolosit intre sesiuni; reincarcat doar daca fisierul s-a schimbat
+            self.engine = InferenceEngine(self.model)
+            source = "din cache" if reused else "de pe disc"
+            self.log_message.emit(f"Model incarcat cu succes {source} ({self.backend}): {type(self.model).__name__}")
         except Exception as e:
             self.log_message.emit(f"Eroare la incarcarea modelului: {e}")
             self.finished.emit()
@@ -60,83 +86,215 @@ class InferenceWorker(QThread):
 
         self.log_message.emit("Pornire fereastra")
 
+        # Etapele ruleaza in paralel: captura (grabber) -> detectie + predictie (acest thread) -> desen (overlay)
+        grabber = LatestFrameGrabber(cap, self.timings)
+        overlay_queue = DropOldestQueue(maxsize=2)
+        overlay_thread = threading.Thread(target=self._overlay_loop, args=(overlay_queue,), daemon=True)
+        grabber.start()
+        overlay_thread.start()
+
+        last_seq = 0
+        skipped_frames = 0
+        processed_frames = 0
+        metrics = None
+        last_report = time.perf_counter()
+        last_stats = last_report
+        last_detections = []
+
         while self.running:
-            ret, frame = cap.read()
-            if not ret:
-                self.log_message.emit("Eroare la citirea frame-ului de la camera")
-                break
-
-            H, W, _ = frame.shape
-            frame_rgb =cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(frame_rgb)
-
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Desenam landmark-urile mainii
-                    mp.solutions.drawing_utils.draw_landmarks(
-                        frame,
-                        hand_landmarks,
-                        self.mp_hands.HAND_CONNECTIONS,
-                        mp.solutions.drawing_styles.get_default_hand_landmarks_style(),
-                        mp.solutions.drawing_styles.get_default_hand_connections_style()
-                    )
-
-                    data_aux = []
-                    x_ = []
-                    y_ = []
-
-                    if len(hand_landmarks.landmark) > 0:
-                        base_x = hand_landmarks.landmark[0].x
-                        base_y = hand_landmarks.landmark[0].y
-                        base_z = hand_landmarks.landmark[0].z
-
-                    for lm in hand_landmarks.landmark:
-                        x_.append(lm.x)
-                        y_.append(lm.y)
-                        x = lm.x - base_x
-                        y = lm.y - base_y
-                        z = lm.z - base_z
-                        data_aux.extend([x, y, z])
-                    
-                    if x_ and y_:
-                        x1 = int(min(x_) * W)
-                        y1 = int(min(y_) * H)
-                        x2 = int(max(x_) * W)
-                        y2 = int(max(y_) * H)
-
-                        try:
-                            data_aux = np.asarray(data_aux).reshape(1, -1)
-
-                            if data_aux.shape[1] != self.model.n_features_in_:
-                                self.log_message.emit(f"Atentie: Se asteapta {self.model.n_features_in_} caracteristici, dar s-au gasit {data_aux.shape[1]}")
-                                continue
-
-                            probabilities = self.model.predict_proba(data_aux)
-                            prediction = self.model.predict(data_aux)
-                            predicted_label = int(prediction[0])
-
-                            predicted_character = self.labels_dict.get(predicted_label, 'Necunoscut')
-                            confidence = probabilities[0][predicted_label]
-
-                            cv2.rectangle(frame, (x1, y1), (x2, y2), self.color_dict.get(predicted_character, (150, 150, 150)), 4)
-
-                            # Adauga eticheta
-                            label_text = f"{predicted_character} ({confidence:.2f})"
-                            cv2.putText(frame, label_text, (x1, y1 - 10),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1.3,
-                                        self.color_dict.get(predicted_character, (150, 150, 150)), 3,
-                                        cv2.LINE_AA)
-
-                            #Emite informatii catre GUI
-                            self.prediction_info.emit(predicted_character, float(confidence))
-                        except Exception as e:
-                            self.log_message.emit(f"Eroare la predictie: {e}")
-                            continue
-            self.frame_ready.emit(frame)
+            latest = grabber.wait_latest(last_seq, timeout=1.0)
+            if latest is None:
+                if grabber.failed:
+                    self.log_message.emit("Eroare la citirea frame-ului de la camera")
+                    break
+                continue
+
+            seq, frame, captured_at = latest
+            skipped_frames += seq - last_seq - 1 # Frame-uri vechi pe care nu le mai procesam
+            last_seq = seq
+
+            # In modul adaptiv, intre detectii desenam ultimele landmark-uri si ultima predictie
+            frame_start = time.perf_counter()
+            detect = self.scheduler.should_detect()
+            if detect:
+                last_detections, points = self._detect_and_predict(frame)
+            else:
+                points = None
+            overlay_queue.put((frame, last_detections, captured_at))
+            processed_frames += 1
+
+            now = time.perf_counter()
+            self.scheduler.frame_done(detect, points, now - frame_start)
+            if now - last_stats >= 1.0:
+                self.detection_stats.emit(self.scheduler.fps, self.scheduler.detections_per_second)
+                # Aruncate: frame-uri sarite inainte de detectie plus cele inlocuite inainte de desen
+                metrics = pipeline_metrics(self.timings, grabber.frames_read, processed_frames,
+                                           skipped_frames + overlay_queue.dropped,
+                                           self.scheduler.fps, self.scheduler.detections_per_second)
+                if self.timings.enabled:
+                    self.stage_metrics.emit(metrics)
+                self._hud_lines = metrics_hud_lines(metrics) if self.show_hud and self.timings.enabled else []
+                last_stats = now
+            if metrics is not None and now - last_report >= self.metrics_interval:
+                self.dump_metrics(metrics)
+                last_report = now
 
+        self.running = False
+        grabber.stop()
+        overlay_queue.put(None) # Opreste etapa de desen
+        overlay_thread.join(timeout=2.0)
         cap.release()
         self.log_message.emit("Camera eliberata. Thread-ul va fi oprit")
-    
+
+    def dump_metrics(self, metrics):
+        """Raportul periodic: text in log si, daca metrics_path este setat, o linie JSON in fisier."""
+        frames = metrics["frames"]
+        text = f"{frames['in']} primite, {frames['processed']} procesate, {frames['dropped']} aruncate"
+        if metrics["stages"]:
+            text = f"Timpi pe etapa (p50/p95/max): {format_stage_stats(metrics['stages'])} | frame-uri: {text}"
+        else:
+            text = f"Frame-uri: {text}"
+        self.log_message.emit(text)
+
+        path = self.metrics_path
+        if path is not None and self.timings.enabled:
+            try:
+                with open(path, 'a', encoding='utf-8') as fh:
+                    fh.write(json.dumps(metrics) + "\n")
+            except OSError as e:
+                self.metrics_path = None
+                self.log_message.emit(f"Eroare la scrierea metricilor in '{path}': {e}")
+
+    def _detect_and_predict(self, frame):
+        """Detectia MediaPipe si predictia pentru un frame; nu modifica frame-ul.
+
+        Intoarce lista detectiilor si landmark-urile (21, 3) ale primei maini (sau None).
+        """
+        start = time.perf_counter()
+        H, W, _ = frame.shape
+        frame_rgb =cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(frame_rgb)
+        self.timings.record("detectie", time.perf_counter() - start)
+
+        detections = []
+        first_points = None
+        features_seconds = 0.0
+        predict_seconds = 0.0
+        if not results.multi_hand_landmarks:
+            self.smoother.reset()
+            self.committer.hand_lost()
+        else:
+            for hand_landmarks in results.multi_hand_landmarks:
+                # Aceleasi caracteristici ca la crearea setului de date (hand_features)
+                features_start = time.perf_counter()
+                points = landmarks_to_array(hand_landmarks)
+                box = bounding_box(points, W, H)
+                if first_points is None:
+                    first_points = points
+
+                try:
+                    data_aux = wrist_relative_features(points)
+                    predict_start = time.perf_counter()
+                    features_seconds += predict_start - features_start
+
+                    if data_aux.shape[0] != self.engine.n_features_in_:
+                        self.log_message.emit(f"Atentie: Se asteapta {self.engine.n_features_in_} caracteristici, dar s-au gasit {data_aux.shape[0]}")
+                        detections.append((hand_landmarks, None, None, None))
+                        continue
+
+                    # O singura trecere prin padure: eticheta si confidenta vin din acelasi vector
+                    prediction = self.engine.predict(data_aux)
+                    if points is first_points:
+                        # Prima mana: folosim media mobila a probabilitatilor, ca eticheta sa nu mai palpaie
+                        smoothed = self.smoother.update(prediction.probabilities)
+                        prediction = self.engine.prediction_from_proba(smoothed)
+                    predict_seconds += time.perf_counter() - predict_start
+
+                    predicted_character = letter_for_label(prediction.label) # Aceeasi mapare ca serviciul si inferenta pe loturi
+                    confidence = prediction.confidence
+                    detections.append((hand_landmarks, box, predicted_character, confidence))
+
+                    #Emite informatii catre GUI
+                    self.prediction_info.emit(predicted_character, float(confidence))
+
+                    if points is first_points:
+                        committed = self.committer.update(predicted_character, confidence)
+                        if committed is not None:
+                            self.letter_committed.emit(committed, self.committer.word)
+                except Exception as e:
+                    self.log_message.emit(f"Eroare la predictie: {e}")
+                    detections.append((hand_landmarks, None, None, None))
+            self.timings.record("caracteristici", features_seconds)
+            self.timings.record("predictie", predict_seconds)
+        return detections, first_points
+
+    def _overlay_loop(self, overlay_queue):
+        """Etapa de desen: landmark-uri, dreptunghi si eticheta, apoi trimite frame-ul catre GUI."""
+        while True:
+            item = overlay_queue.get(timeout=0.5)
+            if item is None:
+                if not self.running:
+                    return
+                continue
+
+            frame, detections, captured_at = item
+            start = time.perf_counter()
+            for hand_landmarks, box, predicted_character, confidence in detections:
+                # Desenam landmark-urile mainii
+                mp.solutions.drawing_utils.draw_landmarks(
+                    frame,
+                    hand_landmarks,
+                    self.mp_hands.HAND_CONNECTIONS,
+                    mp.solutions.drawing_styles.get_default_hand_landmarks_style(),
+                    mp.solutions.drawing_styles.get_default_hand_connections_style()
+                )
+                if predicted_character is None:
+                    continue
+
+                x1, y1, x2, y2 = box
+                color = self.color_dict.get(predicted_character, (150, 150, 150))
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 4)
+
+                # Adauga eticheta
+                label_text = f"{predicted_character} ({confidence:.2f})"
+                cv2.putText(frame, label_text, (x1, y1 - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.3,
+                            color, 3,
+                            cv2.LINE_AA)
+
+            hud_lines = self._hud_lines
+            if hud_lines:
+                draw_metrics_hud(frame, hud_lines)
+            self.frame_ready.emit(frame)
+            end = time.perf_counter()
+            self.timings.record("desen", end - start)
+            self.timings.record("total", end - captured_at)
+
+    def set_adaptive_mode(self, enabled):
+        self.scheduler.enabled = bool(enabled)
+        if not enabled:
+            self.scheduler.interval = 1
+
+    def set_target_fps(self, fps):
+        self.scheduler.target_fps = float(fps)
+
+    def set_metrics_enabled(self, enabled):
+        self.timings.enabled = bool(enabled)
+        if not enabled:
+            self.timings.clear() # La reactivare nu amestecam masuratori vechi cu cele noi
+            self._hud_lines = []
+
+    def set_hud_enabled(self, enabled):
+        self.show_hud = bool(enabled)
+        if not enabled:
+            self._hud_lines = []
+
+    def set_metrics_file(self, enabled):
+        self.metrics_path = LIVE_METRICS_PATH if enabled else None
+
+    def clear_word(self):
+        self.committer.clear_word()
+
     def stop(self):
         self.running = False
     
@@ -152,15 +310,14 @@ class InferenceWindow(QDialog):
 
         self.inference_worker = InferenceWorker()
         self.init_ui()
+        # Conversia si redimensionarea frame-urilor se fac pe thread-ul renderer-ului, nu in GUI
+        self.preview_renderer = PreviewRenderer(self.camera_feed_label.width(), self.camera_feed_label.height(), PREVIEW_FPS)
+        self.preview_renderer.timings = self.inference_worker.timings
         self.connect_signals()
 
+        self.preview_renderer.start()
         self.inference_worker.start()
 
-        self.ui_update_timer = QTimer(self)
-        self.ui_update_timer.setInterval(30)
-        self.ui_update_timer.timeout.connect(self.process_gui_events)
-        self.ui_update_timer.start()
-
     def init_ui(self):
         main_layout = QVBoxLayout()
 
@@ -175,6 +332,43 @@ class InferenceWindow(QDialog):
         self.prediction_info_label.setStyleSheet("font-size: 18px; font-weight: bold; color: lightblue;")
         main_layout.addWidget(self.prediction_info_label)
 
+        word_layout = QHBoxLayout()
+        self.word_label = QLabel("Cuvant: ")
+        self.word_label.setStyleSheet("font-size: 18px; font-weight: bold; color: lightgreen;")
+        word_layout.addWidget(self.word_label)
+        word_layout.addStretch(1)
+        self.clear_word_button = QPushButton("Sterge Cuvantul")
+        word_layout.addWidget(self.clear_word_button)
+        main_layout.addLayout(word_layout)
+
+        # Modul adaptiv: detectie completa doar la unele frame-uri, pentru calculatoare mai slabe
+        adaptive_layout = QHBoxLayout()
+        self.adaptive_checkbox = QCheckBox("Detectie adaptiva")
+        adaptive_layout.addWidget(self.adaptive_checkbox)
+        adaptive_layout.addWidget(QLabel("FPS tinta:"))
+        self.target_fps_spinbox = QSpinBox()
+        self.target_fps_spinbox.setRange(5, 60)
+        self.target_fps_spinbox.setValue(int(self.inference_worker.scheduler.target_fps))
+        adaptive_layout.addWidget(self.target_fps_spinbox)
+        adaptive_layout.addStretch(1)
+        self.detection_stats_label = QLabel("FPS: N/A | Detectii/s: N/A")
+        adaptive_layout.addWidget(self.detection_stats_label)
+        main_layout.addLayout(adaptive_layout)
+
+        # Instrumentarea: timpi pe etape (p50/p95/max), HUD peste imagine si salvarea periodica in JSON
+        metrics_layout = QHBoxLayout()
+        self.metrics_checkbox = QCheckBox("Metrici latenta")
+        self.metrics_checkbox.setChecked(self.inference_worker.timings.enabled)
+        metrics_layout.addWidget(self.metrics_checkbox)
+        self.hud_checkbox = QCheckBox("HUD pe imagine")
+        metrics_layout.addWidget(self.hud_checkbox)
+        self.metrics_file_checkbox = QCheckBox(f"Salveaza in {LIVE_METRICS_PATH}")
+        metrics_layout.addWidget(self.metrics_file_checkbox)
+        metrics_layout.addStretch(1)
+        self.latency_label = QLabel("Latenta: N/A")
+        metrics_layout.addWidget(self.latency_label)
+        main_layout.addLayout(metrics_layout)
+
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setMinimumHeight(80)
@@ -187,35 +381,66 @@ class InferenceWindow(QDialog):
         self.setLayout(main_layout)
     
     def connect_signals(self):
-        self.inference_worker.frame_ready.connect(self.display_frame)
+        # DirectConnection: frame-ul ajunge la renderer direct din thread-ul de desen al worker-ului
+        self.inference_worker.frame_ready.connect(self.preview_renderer.submit, Qt.ConnectionType.DirectConnection)
+        self.preview_renderer.image_ready.connect(self.display_image)
         self.inference_worker.log_message.connect(self.log_text.append)
         self.inference_worker.prediction_info.connect(self.update_prediction_info)
+        self.inference_worker.detection_stats.connect(self.update_detection_stats)
+        self.inference_worker.letter_committed.connect(self.on_letter_committed)
+        self.clear_word_button.clicked.connect(self.clear_word)
+        self.adaptive_checkbox.toggled.connect(self.inference_worker.set_adaptive_mode)
+        self.target_fps_spinbox.valueChanged.connect(self.inference_worker.set_target_fps)
+        self.inference_worker.stage_metrics.connect(self.update_stage_metrics)
+        self.metrics_checkbox.toggled.connect(self.on_metrics_toggled)
+        self.hud_checkbox.toggled.connect(self.inference_worker.set_hud_enabled)
+        self.metrics_file_checkbox.toggled.connect(self.inference_worker.set_metrics_file)
         self.inference_worker.finished.connect(self.on_inference_finished)
     
-    @Slot(np.ndarray)
-    def display_frame(self, frame):
-        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-        p = convert_to_Qt_format.scaled(self.camera_feed_label.width(), self.camera_feed_label.height(),
-                                        Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-        self.camera_feed_label.setPixmap(QPixmap.fromImage(p))
+    @Slot(QImage)
+    def display_image(self, image):
+        start = time.perf_counter()
+        self.camera_feed_label.setPixmap(QPixmap.fromImage(image))
+        self.inference_worker.timings.record("afisare", time.perf_counter() - start)
 
     
     @Slot(str, float)
     def update_prediction_info(self, character, confidence):
         self.prediction_info_label.setText(f"Predictie: {character} | Confidenta: {confidence:.2f}")
 
+    @Slot(str, str)
+    def on_letter_committed(self, letter, word):
+        self.word_label.setText(f"Cuvant: {word}")
+
+    def clear_word(self):
+        self.inference_worker.clear_word()
+        self.word_label.setText("Cuvant: ")
+
+    @Slot(float, float)
+    def update_detection_stats(self, fps, detections_per_second):
+        rate = 100.0 * detections_per_second / fps if fps > 0 else 0.0
+        self.detection_stats_label.setText(f"FPS: {fps:.1f} | Detectii/s: {detections_per_second:.1f} ({rate:.0f}%)")
+
+    @Slot(dict)
+    def update_stage_metrics(self, metrics):
+        total = metrics["stages"].get("total")
+        if total is not None:
+            self.latency_label.setText(f"Latenta: p50 {total['p50']:.0f} ms | p95 {total['p95']:.0f} ms | "
+                                       f"aruncate: {metrics['frames']['dropped']}")
+
+    def on_metrics_toggled(self, enabled):
+        self.inference_worker.set_metrics_enabled(enabled)
+        self.hud_checkbox.setEnabled(enabled)
+        self.metrics_file_checkbox.setEnabled(enabled)
+        if not enabled:
+            self.latency_label.setText("Latenta: N/A")
+
     @Slot()
     def on_inference_finished(self):
         self.log_text.append("InferenceWorker a finalizat")
         QMessageBox.information(self, "Inferenta terminata", "Modelul fost oprit din testare")
         self.close()
     
-    def process_gui_events(self):
-        QApplication.processEvents()
-    
     def closeEvent(self, event):
         reply = QMessageBox.question(self, "Inchide Fereastra", "Sigur doresti sa opresti testarea si sa inchizi fereastra?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -223,7 +448,7 @@ class InferenceWindow(QDialog):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.inference_worker.stop()
-            self.ui_update_timer.stop()
+            self.preview_renderer.stop()
             event.accept()
             self.inference_finished.emit()
         else: